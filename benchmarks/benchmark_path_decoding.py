@@ -0,0 +1,80 @@
+from main import HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator
+from modules.functions import (from_path_to_d_torsion_class, from_path_to_d_torsion_class_by_blocks,
+                               iter_d_torsion_classes, iter_d_torsion_class_bitmasks)
+from modules.helpers import find_paths_of_given_length_in_a_multigraph
+from time import perf_counter
+
+def look_up_all_edges(paths, look_up):
+    """
+    Look up every edge of all given paths by its label and return the time taken in seconds.
+
+    :param paths: List of paths in G(C)
+    :param look_up: Function from the label of an edge to the edge
+    :return: The time taken in seconds
+    """
+    start = perf_counter()
+    for path in paths:
+        for source, label, target in path:
+            look_up(label)
+    return perf_counter() - start
+
+def benchmark_algebra(d, l, p):
+    """
+    Compare looking up the edges of all paths of G(C) by scanning the edges of the graph for every label against using the edge ids by label, and decoding all paths from the templates of their edges against using the module lists of the blocks, against building the d-torsion classes along the enumeration of the paths, and against building only their bitmasks along the enumeration over the edge ids.
+    """
+    calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator()
+    calc.cache = None
+    calc.set_initial_data(d, l, p)
+
+    start = perf_counter()
+    paths = sum([find_paths_of_given_length_in_a_multigraph(
+        calc.G, node, calc.p - 1) for node in calc.odd_nodes], [])
+    enumeration_time = perf_counter() - start
+
+    scanning_time = look_up_all_edges(paths, calc.G.edge_labels.index)
+    indexed_time = look_up_all_edges(paths, calc.G.edge_ids_by_label.__getitem__)
+
+    start = perf_counter()
+    for path in paths:
+        from_path_to_d_torsion_class(calc.G, path, calc.simples, calc.l, calc.d)
+    template_time = perf_counter() - start
+
+    start = perf_counter()
+    for path in paths:
+        from_path_to_d_torsion_class_by_blocks(path, calc.node_lists, calc.edge_lists)
+    block_time = perf_counter() - start
+
+    start = perf_counter()
+    for node in calc.odd_nodes:
+        for torsion_class, path in iter_d_torsion_classes(calc.G, node, calc.simples, calc.l):
+            pass
+    incremental_time = perf_counter() - start
+
+    start = perf_counter()
+    for node in calc.odd_nodes:
+        for edge_ids, bitmask in iter_d_torsion_class_bitmasks(calc.G, node, calc.node_blocks, calc.edge_blocks):
+            pass
+    bitmask_time = perf_counter() - start
+
+    print(f"d={d}, l={l}, p={p}: {len(paths)} paths, {calc.G.number_of_edges()} edges")
+    print(f"  enumerating paths: {enumeration_time:.3f}s")
+    print(f"  looking up edges by scanning: {scanning_time:.3f}s")
+    print(f"  looking up edges by label:    {indexed_time:.3f}s ({scanning_time / indexed_time:.1f}x faster)")
+    print(f"  decoding by templates: {template_time:.3f}s")
+    print(f"  decoding by blocks:    {block_time:.3f}s ({template_time / block_time:.1f}x faster)")
+    print(f"  decoding along the enumeration: {incremental_time:.3f}s")
+    print(f"  bitmasks along the enumeration: {bitmask_time:.3f}s")
+
+def run_benchmarks():
+    """Run the benchmark for the largest test cases"""
+    benchmark_cases = [
+        #(d, l, p),
+        (6, 6, 6),
+        (4, 6, 6),
+        (2, 6, 6),
+    ]
+    for d, l, p in benchmark_cases:
+        benchmark_algebra(d, l, p)
+
+if __name__ == "__main__":
+    run_benchmarks()
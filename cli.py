@@ -0,0 +1,164 @@
+import argparse
+import sys
+from main import HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator
+from modules.functions import is_tau_d_rigid_pair, from_path_to_d_torsion_class_by_blocks
+from modules.helpers import string_from_modules, format_path, parse_module_input, parse_pair_input
+
+def read_queries(filename):
+    """
+    Read queries one per line from a file, or from stdin if the filename is '-'. Empty lines and lines starting with # are skipped.
+
+    :param filename: The name of the file.
+    :return: A generator of tuples (line_number, line).
+    """
+    f = sys.stdin if filename == '-' else open(filename, encoding='utf-8')
+    try:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line_number, line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def answer_queries(calc, filename, answer):
+    """
+    Answer all queries of a file against one calculator and print one tab separated line per query, starting with its line number. A query which cannot be parsed gives an error line and the remaining queries are still answered.
+
+    :param calc: The calculator.
+    :param filename: The name of the file, or '-' for stdin.
+    :param answer: Function from a query line to the answer string, raising ValueError for invalid queries.
+    :return: The exit code, 1 if some query was invalid and 0 otherwise.
+    """
+    exit_code = 0
+    for line_number, line in read_queries(filename):
+        try:
+            print(f"{line_number}\t{answer(line)}")
+        except ValueError as e:
+            print(f"{line_number}\terror: {e}")
+            exit_code = 1
+    return exit_code
+
+def format_pair(calc, M, P):
+    M_str, P_str = calc._format_module_pair(M, P)
+    return f"{M_str}\t{P_str}"
+
+def command_info(calc, args):
+    print(f"Algebra: kA_{calc.n}/(paths of length {calc.l})")
+    print(f"d: {calc.d}")
+    print(f"Number of diagonals: {calc.p}")
+    print(f"Number of indecomposable modules in C: {len(calc.cluster_tilting)}")
+    print(f"Number of vertices of G: {calc.G.number_of_nodes()}")
+    print(f"Number of edges of G: {calc.G.number_of_edges()}")
+    print(f"Number of {calc.d}-torsion classes: {calc.count_torsion_classes()}")
+    print(f"Number of {calc.d}-torsion classes U by the size of U: "
+          + ", ".join(f"{size}: {count}" for size, count in calc.size_distribution().items()))
+    print(f"Number of {calc.d}-torsion classes U by the size of M^U: "
+          + ", ".join(f"{size}: {count}" for size, count in calc.ext_d_projective_distribution().items()))
+    return 0
+
+def command_count(calc, args):
+    print(calc.count_torsion_classes())
+    return 0
+
+def command_enumerate(calc, args):
+    for i, (tc, path) in enumerate(calc.iter_torsion_classes(), 1):
+        print(f"{i}\t{string_from_modules(tc)}\t{format_path(path)}")
+    return 0
+
+def command_pairs(calc, args):
+    if args.input is None:
+        torsion_classes = calc.get_all_torsion_classes()
+        pairs = calc.compute_tau_d_rigid_pairs([tc for tc, path in torsion_classes])
+        for i, ((tc, path), (M_U, P_U)) in enumerate(zip(torsion_classes, pairs), 1):
+            print(f"{i}\t{string_from_modules(tc)}\t{format_pair(calc, M_U, P_U)}")
+        return 0
+
+    def answer(line):
+        path = calc.find_torsion_class_path(parse_module_input(line, calc.n, calc.l))
+        if path is None:
+            raise ValueError(f"This is not a valid {calc.d}-torsion class")
+        M_U, P_U = calc.compute_tau_d_rigid_pair(from_path_to_d_torsion_class_by_blocks(path, calc.node_lists, calc.edge_lists))
+        return format_pair(calc, M_U, P_U)
+    return answer_queries(calc, args.input, answer)
+
+def command_minimal(calc, args):
+    def answer(line):
+        M, P = parse_pair_input(line, calc.n, calc.l)
+        M_basic, P_basic, is_basic = calc._get_basic_pair(M, P)
+        is_valid, message = is_tau_d_rigid_pair(M_basic, P_basic, calc.l, calc.d)
+        if not is_valid:
+            return f"not tau_{calc.d}-rigid\t{message}"
+        minimal = calc.find_minimal_torsion_class(M_basic)
+        if minimal is None:
+            return "no torsion class"
+        min_tc, min_path = minimal
+        return f"{string_from_modules(min_tc)}\t{format_path(min_path)}"
+    return answer_queries(calc, args.input, answer)
+
+def command_check_rigid(calc, args):
+    def answer(line):
+        M, P = parse_pair_input(line, calc.n, calc.l)
+        M_basic, P_basic, is_basic = calc._get_basic_pair(M, P)
+        is_valid, message = is_tau_d_rigid_pair(M_basic, P_basic, calc.l, calc.d)
+        if not is_valid:
+            return f"not tau_{calc.d}-rigid\t{message}"
+        total_modules = len(set(M_basic).union(set(P_basic)))
+        if total_modules == calc.n:
+            return f"tau_{calc.d}-rigid\tsummand maximal"
+        return f"tau_{calc.d}-rigid\tnot summand maximal ({total_modules} of {calc.n} summands)"
+    return answer_queries(calc, args.input, answer)
+
+def command_export(calc, args):
+    try:
+        count = calc.export_torsion_class_table(args.output, args.format, args.pairs, args.processes)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(count)
+    return 0
+
+COMMANDS = {
+    'info': (command_info, "display information about the algebra"),
+    'count': (command_count, "count the d-torsion classes without enumerating them"),
+    'enumerate': (command_enumerate, "list all d-torsion classes with their paths in G"),
+    'export': (command_export, "write all d-torsion classes to an NDJSON or CSV file as they are enumerated"),
+    'pairs': (command_pairs, "compute the summand maximal tau_d-rigid pairs of all d-torsion classes, or of those given in the input"),
+    'minimal': (command_minimal, "find the minimal d-torsion class containing every tau_d-rigid pair of the input"),
+    'check-rigid': (command_check_rigid, "check if every pair of the input is tau_d-rigid and summand maximal"),
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Non-interactive calculator of higher tau-tilting theory for linear Nakayama algebras with homogeneous relations. "
+                    "Queries are read one per line, pairs in the format 'M: M-1-1,M-1-2; P: M-2-3' or 'M: M(1,1) ⊕ M(1,2); P: M(2,3)'.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (command, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument('-d', type=int, required=True, help="d in the d-cluster tilting subcategory")
+        subparser.add_argument('-l', type=int, required=True, help="length of zero paths")
+        subparser.add_argument('-p', type=int, required=True, help="number of diagonals")
+        subparser.add_argument('--cache-dir', default=None,
+                               help="directory where the enumerated d-torsion classes are cached for later runs (default: $D_TORSION_CACHE_DIR, or only in memory)")
+        if name in ('pairs', 'minimal', 'check-rigid'):
+            subparser.add_argument('-i', '--input', default=None if name == 'pairs' else '-',
+                                   help="file with one query per line, or - for stdin" + (" (default: all d-torsion classes)" if name == 'pairs' else " (default: stdin)"))
+        if name == 'export':
+            subparser.add_argument('-o', '--output', required=True, help="file to write, compressed with gzip if it ends with .gz")
+            subparser.add_argument('--format', choices=['ndjson', 'csv'], default=None, help="format of the file (default: from its extension)")
+            subparser.add_argument('--pairs', action='store_true', help="also write the summand maximal tau_d-rigid pair of every class")
+            subparser.add_argument('--processes', type=int, default=1, help="number of worker processes (default: 1)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator(args.cache_dir)
+    try:
+        calc.set_initial_data(args.d, args.l, args.p)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return COMMANDS[args.command][0](calc, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,32 @@
+import random
+from itertools import islice
+from array import array
 from modules.classes import Module
 from modules.graph_builder import build_graph
-from modules.functions import from_path_to_d_torsion_class, ext_d_projective_modules, maximal_projective, minimal_torsion_class, is_tau_d_rigid_pair, tau_d
-from modules.helpers import find_paths_of_given_length_in_a_multigraph, string_from_modules, parse_module_input, format_path
+from modules.counting import (count_torsion_classes, path_counts, unrank_path, iter_paths_from_rank, rank_path,
+                              path_weight_distribution, size_distribution)
+from modules.tables import HomologicalTables
+from modules.index import TorsionClassIndex
+from modules.lattice import TorsionClassLattice
+from modules.mutation import mutation_edges, write_mutation_graph
+from modules.cache import EnumerationCache, layout_fingerprint
+from modules.store import write_store, TorsionClassStore
+from modules.parallel import iter_torsion_classes_parallel
+from modules.export import export_format, open_export_file, write_torsion_classes
+from modules.solvers import torsion_class_blocks, minimal_torsion_class_path, torsion_class_path, ext_d_projective_weights
+from modules.functions import (iter_d_torsion_classes, iter_d_torsion_class_bitmasks, from_path_to_d_torsion_class, block_module_lists,
+                               from_path_to_d_torsion_class_by_blocks, is_tau_d_rigid_pair, tau_d)
+from modules.helpers import modules_to_bitmask, bitmask_to_modules, string_from_modules, parse_module_input, format_path
+
+# Number of d-torsion classes shown at a time in menu option 3
+TORSION_CLASS_PAGE_SIZE = 10
 
 class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
     # Initialization methods    
-    def __init__(self):
+    def __init__(self, cache_directory=None):
+        """
+        :param cache_directory: Directory where the enumerated d-torsion classes are cached for later sessions, by default the one given by the environment variable D_TORSION_CACHE_DIR. If neither is given they are only cached in memory.
+        """
         self.d = None # d in d-cluster tilting
         self.l = None # l is the length of paths modded out
         self.p = None # p is the number of diagonals in the d-cluster tilting subcategory
@@ -13,9 +34,21 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         self.simples = None # simples is the list of simple modules
         self.projectives = None # projectives is the list of projective modules
         self.cluster_tilting = None  # C is the d-cluster tilting subcategory
+        self.module_index = None # module_index is the dictionary from modules in C to their position in cluster_tilting
+        self.tables = None # tables contains the precomputed diagonals, tau_d, Ext^d and Hom of the modules in C
         self.G = None # G is the graph giving d-torsion classes
+        self.edges = None # edges is the list of (source, edge_label, target) tuples by edge id of G, so that edges can be given by their id
+        self.edge_ids = None # edge_ids is the dictionary from edge labels to their id in G
         self.odd_nodes = None # odd_nodes is the list of all nodes with odd subscript
         self.even_nodes = None # even_nodes is the list of all nodes with even subscript
+        self.path_counts = None # path_counts[k] is the list of the numbers of paths of length k starting at every node, by node id
+        self.node_blocks = None # node_blocks[i] is the dictionary from nodes to the bitmask of their modules in diagonal i+1
+        self.edge_blocks = None # edge_blocks[i] is the dictionary from edge ids to the bitmask of their modules after diagonal i+1
+        self.node_lists = None # node_lists[i] is the dictionary from nodes to the list of their modules in diagonal i+1
+        self.edge_lists = None # edge_lists[i] is the dictionary from edge labels to the list of their modules after diagonal i+1
+        self.torsion_class_index = None # torsion_class_index is the TorsionClassIndex of all d-torsion classes, built when first needed
+        self.torsion_class_lattice = None # torsion_class_lattice is the TorsionClassLattice of all d-torsion classes, built when first needed
+        self.cache = EnumerationCache(cache_directory) # cache is the cache of the enumerated d-torsion classes, kept when the initial data changes
 
     def _should_retry(self, error_msg=None):
         if error_msg:
@@ -131,9 +164,24 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         
         # Convert set to sorted list for better display
         self.cluster_tilting = sorted(list(C), key=lambda m: (m.a, m.b))
+        self.module_index = {module: i for i, module in enumerate(self.cluster_tilting)}
+
+    def _calculate_tables(self):
+        self.tables = HomologicalTables(self.cluster_tilting, self.simples, self.d, self.l, self.n)
 
     def _build_graph(self):
-        self.G, _, _, self.odd_nodes, self.even_nodes = build_graph(self.l, self.d)
+        self.G, self.odd_nodes, self.even_nodes = build_graph(self.l, self.d)
+        self.edges = self.G.edge_tuples
+        self.edge_ids = self.G.edge_ids_by_label
+
+    def _calculate_path_counts(self):
+        self.path_counts = path_counts(self.G, self.p - 1)
+
+    def _calculate_blocks(self):
+        self.node_blocks, self.edge_blocks = torsion_class_blocks(
+            self.G, self.odd_nodes, self.even_nodes, self.simples, self.l, self.module_index)
+        self.node_lists, self.edge_lists = block_module_lists(
+            self.G, self.odd_nodes, self.even_nodes, self.simples, self.l)
 
     def _reset_values(self):
         """Reset all values to None before reinitializing"""
@@ -144,9 +192,20 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         self.simples = None
         self.projectives = None
         self.cluster_tilting = None
+        self.module_index = None
+        self.tables = None
         self.G = None
+        self.edges = None
+        self.edge_ids = None
         self.odd_nodes = None
         self.even_nodes = None
+        self.path_counts = None
+        self.node_blocks = None
+        self.edge_blocks = None
+        self.node_lists = None
+        self.edge_lists = None
+        self.torsion_class_index = None
+        self.torsion_class_lattice = None
 
     def initialize(self):
         print("\nWelcome to the calculator of higher tau-tilting theory for linear Nakayama algebras with homogeneous relations!")
@@ -154,11 +213,31 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         # Reset all values before getting new input
         self._reset_values()  
         self._get_user_input()
+        self._calculate_all()
+
+    def set_initial_data(self, d, l, p):
+        """Set the starting data (d, l, p) without prompts and compute everything from it, raising ValueError if it is not valid"""
+        if l < 2:
+            raise ValueError("l must be greater than or equal to 2")
+        if d < 2 or (l > 2 and d % 2 != 0):
+            raise ValueError("d must be greater than or equal to 2, and even when l > 2")
+        if p < 2 or (l > 2 and p % 2 != 0):
+            raise ValueError("p must be greater than or equal to 2, and even when l > 2")
+        self._reset_values()
+        self.d = d
+        self.l = l
+        self.p = p
+        self._calculate_all()
+
+    def _calculate_all(self):
         self._calculate_n()
         self._calculate_simples()
         self._calculate_projectives()
         self._calculate_d_cluster_tilting_subcategory()
+        self._calculate_tables()
         self._build_graph()
+        self._calculate_path_counts()
+        self._calculate_blocks()
 
     # Helper methods    
     def _format_module_pair(self, M_U, P_U):
@@ -172,11 +251,186 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         is_basic = (len(M) == len(M_basic) and len(P) == len(P_basic))
         return M_basic, P_basic, is_basic   
 
+    def to_bitmask(self, modules):
+        """Convert a list of modules in C to a bitmask over cluster_tilting"""
+        return modules_to_bitmask(modules, self.module_index)
+
+    def from_bitmask(self, bitmask):
+        """Convert a bitmask over cluster_tilting to a list of modules"""
+        return bitmask_to_modules(bitmask, self.cluster_tilting)
+
+    def iter_torsion_classes(self):
+        """Iterate over all d-torsion classes as tuples (torsion_class, path) without holding them in memory"""
+        for node in self.odd_nodes:
+            yield from iter_d_torsion_classes(self.G, node, self.simples, self.l)
+
+    def path_to_edge_ids(self, path):
+        """Convert a path given by (source, edge_label, target) tuples to the ids of its edges in G"""
+        return [self.edge_ids[label] for _, label, _ in path]
+
+    def path_from_edge_ids(self, edge_ids):
+        """Convert the ids of edges in G to a path given by (source, edge_label, target) tuples"""
+        return [self.edges[i] for i in edge_ids]
+
+    def get_torsion_class_records(self):
+        """Get all d-torsion classes as a tuple (edge_ids, bitmasks) of the ids of the edges of their paths in G, one path after another, and their bitmasks, from the cache if possible"""
+        fingerprint = layout_fingerprint(self.cluster_tilting, self.G.edge_names)
+        records = self.cache.get(self.d, self.l, self.p, fingerprint) if self.cache is not None else None
+        if records is None:
+            path_edge_ids = array('I')
+            bitmasks = []
+            for node in self.odd_nodes:
+                for edge_ids, bitmask in iter_d_torsion_class_bitmasks(self.G, node, self.node_blocks, self.edge_blocks):
+                    path_edge_ids.extend(edge_ids)
+                    bitmasks.append(bitmask)
+            records = (path_edge_ids, bitmasks)
+            if self.cache is not None:
+                self.cache.put(self.d, self.l, self.p, path_edge_ids, bitmasks, len(self.cluster_tilting), fingerprint)
+        return records
+
     def get_all_torsion_classes(self):
-        paths = sum([find_paths_of_given_length_in_a_multigraph(
-            self.G, node, self.p - 1) for node in self.odd_nodes], [])
-        return [(from_path_to_d_torsion_class(self.G, path, self.simples, self.l, self.d), path) 
-                for path in paths]
+        if self.cache is None:
+            return list(self.iter_torsion_classes())
+        edge_ids, bitmasks = self.get_torsion_class_records()
+        torsion_classes = []
+        for start in range(0, len(edge_ids), self.p - 1):
+            path = self.path_from_edge_ids(edge_ids[start:start + self.p - 1])
+            torsion_classes.append((from_path_to_d_torsion_class_by_blocks(path, self.node_lists, self.edge_lists), path))
+        return torsion_classes
+
+    def iter_torsion_classes_parallel(self, processes=None, compute_pairs=False):
+        """Iterate over all d-torsion classes with a pool of processes as tuples (torsion_class, path, M_U, P_U) of bitmasks and paths, in the same order as iter_torsion_classes"""
+        return iter_torsion_classes_parallel(self.G, self.odd_nodes, self.node_blocks, self.edge_blocks, self.tables,
+                                             processes=processes, compute_pairs=compute_pairs)
+
+    def export_torsion_classes(self, filename, processes=1):
+        """Write all d-torsion classes to a store file of fixed-width records, streaming them from the enumeration, and return their number"""
+        records = ((self.path_to_edge_ids(path), tc) for tc, path, M_U, P_U in self.iter_torsion_classes_parallel(processes))
+        return write_store(filename, records, self.d, self.l, self.p, len(self.edges), len(self.cluster_tilting))
+
+    def export_torsion_class_table(self, filename, file_format=None, include_pairs=False, processes=1):
+        """Write all d-torsion classes to an NDJSON or CSV file, compressed with gzip if its name ends with .gz, streaming them from the enumeration, and return their number. The format is found from the extension of the file unless it is given"""
+        file_format = file_format or export_format(filename)
+        records = self.iter_torsion_classes_parallel(processes, compute_pairs=include_pairs)
+        with open_export_file(filename) as f:
+            return write_torsion_classes(f, records, file_format, self.cluster_tilting, self.G, include_pairs)
+
+    def open_torsion_class_store(self, filename):
+        """Open a store file written by export_torsion_classes for the current algebra"""
+        store = TorsionClassStore(filename)
+        if (store.d, store.l, store.p) != (self.d, self.l, self.p):
+            store.close()
+            raise ValueError(f"Store file {filename} is for d={store.d}, l={store.l}, p={store.p}")
+        return store
+
+    def build_torsion_class_index(self):
+        """Enumerate all d-torsion classes and index them by the modules they contain, unless this has been done already"""
+        if self.torsion_class_index is None:
+            self.torsion_class_index = TorsionClassIndex(self.get_torsion_class_records()[1], len(self.cluster_tilting))
+        return self.torsion_class_index
+
+    def get_torsion_class(self, rank):
+        """Get the d-torsion class in a given position of the enumeration, starting from 0, as a tuple (torsion_class, path) without enumerating the ones before it"""
+        path = unrank_path(self.G, self.odd_nodes, self.path_counts, rank)
+        return from_path_to_d_torsion_class_by_blocks(path, self.node_lists, self.edge_lists), path
+
+    def rank_torsion_class(self, path):
+        """Get the position in the enumeration, starting from 0, of the d-torsion class of a path"""
+        return rank_path(self.G, self.odd_nodes, self.path_counts, path)
+
+    def _number_of_torsion_classes(self):
+        return sum(self.path_counts[self.p - 1][self.G.node_ids[node]] for node in self.odd_nodes)
+
+    def iter_torsion_classes_from(self, offset):
+        """Iterate over the d-torsion classes from a given position of the enumeration, starting from 0, as tuples (torsion_class, path) without enumerating the ones before it"""
+        for path in iter_paths_from_rank(self.G, self.odd_nodes, self.path_counts, offset):
+            yield from_path_to_d_torsion_class_by_blocks(path, self.node_lists, self.edge_lists), path
+
+    def get_torsion_class_page(self, offset, limit):
+        """
+        Get a page of the d-torsion classes in the order of the enumeration without enumerating the ones before it.
+
+        :param offset: The position of the first d-torsion class of the page, starting from 0.
+        :param limit: The largest number of d-torsion classes in the page.
+        :return: A tuple (torsion_classes, next_offset), where torsion_classes is a list of tuples (torsion_class, path) in the positions offset to offset+limit-1, and next_offset is the offset of the next page, or None if there are no further d-torsion classes.
+        :raises ValueError: If offset or limit is negative.
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must be non-negative")
+        total = self._number_of_torsion_classes()
+        if offset >= total or limit == 0:
+            return [], (offset if offset < total else None)
+        torsion_classes = list(islice(self.iter_torsion_classes_from(offset), limit))
+        next_offset = offset + len(torsion_classes)
+        return torsion_classes, (next_offset if next_offset < total else None)
+
+    def sample_torsion_classes(self, number, rng=None):
+        """Draw a number of d-torsion classes uniformly at random, as tuples (torsion_class, path)"""
+        rng = rng or random.Random()
+        total = self._number_of_torsion_classes()
+        return [self.get_torsion_class(rng.randrange(total)) for _ in range(number)]
+
+    def build_torsion_class_lattice(self):
+        """Compute the Hasse diagram of all d-torsion classes ordered by inclusion, unless this has been done already"""
+        if self.torsion_class_lattice is None:
+            self.torsion_class_lattice = TorsionClassLattice(self.build_torsion_class_index())
+        return self.torsion_class_lattice
+
+    def compute_mutation_graph(self):
+        """Compute the mutation graph of the summand maximal tau_d-rigid pairs of all d-torsion classes as a tuple (pairs, edges), where pairs are the tuples (M_U, P_U) of bitmasks in the order of the enumeration and edges are as in mutation_edges"""
+        pairs = self.tables.tau_d_rigid_pairs(self.get_torsion_class_records()[1])
+        return pairs, mutation_edges(pairs, len(self.cluster_tilting))
+
+    def export_mutation_graph(self, filename):
+        """Write the mutation graph of the summand maximal tau_d-rigid pairs of all d-torsion classes to a GraphML file and return its numbers of vertices and edges"""
+        pairs, edges = self.compute_mutation_graph()
+        write_mutation_graph(filename, pairs, edges, self.cluster_tilting)
+        return len(pairs), len(edges)
+
+    def count_torsion_classes(self):
+        return count_torsion_classes(self.G, self.odd_nodes, self.even_nodes, self.p)
+
+    def size_distribution(self):
+        """Count the d-torsion classes U by their size |U| without enumerating them, as a dictionary from sizes to numbers"""
+        return size_distribution(self.G, self.odd_nodes, self.p)
+
+    def ext_d_projective_distribution(self):
+        """Count the d-torsion classes U by the size |M^U| of their Ext^d-projective generator without enumerating them, as a dictionary from sizes to numbers"""
+        node_weights, edge_weights = ext_d_projective_weights(
+            self.G, self.odd_nodes, self.node_blocks, self.edge_blocks, self.tables)
+        return path_weight_distribution(self.G, self.odd_nodes, self.p, node_weights, edge_weights)
+
+    def _pair_from_bitmasks(self, torsion_class, M_U, P_U):
+        return ([module for module in torsion_class if M_U >> self.module_index[module] & 1],
+                [module for module in self.projectives if P_U >> self.module_index[module] & 1])
+
+    def compute_tau_d_rigid_pair(self, torsion_class):
+        """Compute the summand maximal tau_d-rigid pair (M^U, P^U) of a d-torsion class U using the precomputed tables"""
+        M_U = self.tables.ext_d_projective_modules(self.to_bitmask(torsion_class))
+        P_U = self.tables.maximal_projective(M_U)
+        return self._pair_from_bitmasks(torsion_class, M_U, P_U)
+
+    def compute_tau_d_rigid_pairs(self, torsion_classes):
+        """Compute the summand maximal tau_d-rigid pairs (M^U, P^U) of a list of d-torsion classes U in one pass"""
+        pairs = self.tables.tau_d_rigid_pairs([self.to_bitmask(tc) for tc in torsion_classes])
+        return [self._pair_from_bitmasks(tc, M_U, P_U) for tc, (M_U, P_U) in zip(torsion_classes, pairs)]
+
+    def find_torsion_class_path(self, modules):
+        """Find the path in G corresponding to a list of modules, or None if they do not form a d-torsion class"""
+        if not all(module in self.module_index for module in modules):
+            return None
+        return torsion_class_path(self.to_bitmask(modules), self.G, self.odd_nodes, self.node_blocks, self.edge_blocks)
+
+    def find_minimal_torsion_class(self, modules):
+        """Find the minimal d-torsion class containing a list of modules as a tuple (torsion_class, path), or None if there is none"""
+        if not all(module in self.module_index for module in modules):
+            return None
+        result = minimal_torsion_class_path(
+            self.to_bitmask(modules), self.G, self.odd_nodes, self.node_blocks, self.edge_blocks)
+        if result is None:
+            return None
+        bitmask, path = result
+        return from_path_to_d_torsion_class(self.G, path, self.simples, self.l, self.d), path
     
     # Menu
     def display_menu(self):
@@ -189,7 +443,8 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         print("6. Change initial data")
         print("7. Convert between module formats")
         print("8. Exit")
-        return input("\nEnter your choice (1-8): ")
+        print(f"9. Search {self.d}-torsion classes by the modules they contain")
+        return input("\nEnter your choice (1-9): ")
 
     # Menu option 1
     def display_info(self):
@@ -212,6 +467,11 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         print("\nInformation about the graph G=G(C):")
         print(f"Number of vertices: {self.G.number_of_nodes()}")
         print(f"Number of edges: {self.G.number_of_edges()}")
+        print(f"Number of {self.d}-torsion classes: {self.count_torsion_classes()}")
+        print(f"Number of {self.d}-torsion classes U by the size of U:")
+        print(", ".join(f"{size}: {count}" for size, count in self.size_distribution().items()))
+        print(f"Number of {self.d}-torsion classes U by the size of M^U:")
+        print(", ".join(f"{size}: {count}" for size, count in self.ext_d_projective_distribution().items()))
         
         print("\nOdd nodes:")
         print(", ".join(self.odd_nodes))
@@ -220,16 +480,25 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
         print(", ".join(self.even_nodes))
         
         print("\nEdges and their labels:")
-        for u, v, key, data in self.G.edges(keys=True, data=True):
-            print(f"{u} -> {v}: {data.get('label', '')}")
+        for u, label, v in self.edges:
+            print(f"{u} -> {v}: {label}")
 
     # Menu option 2
     def display_torsion_classes(self):
         print(f"\nComputing all {self.d}-torsion classes...")
-        torsion_classes = self.get_all_torsion_classes()
         
-        print(f"\nFound {len(torsion_classes)} {self.d}-torsion classes:")
-        for i, (tc, path) in enumerate(torsion_classes, 1):
+        filename = input("\nEnter a file name ending in .ndjson or .csv, optionally followed by .gz, to export them, or leave empty to print them: ").strip()
+        if filename:
+            try:
+                include_pairs = input(f"Include the summand maximal tau_{self.d}-rigid pairs? (y/n): ").lower() == 'y'
+                count = self.export_torsion_class_table(filename, include_pairs=include_pairs)
+                print(f"\nExported {count} {self.d}-torsion classes to {filename}")
+            except (ValueError, OSError) as e:
+                print(f"\nError: {e}")
+            return
+
+        print(f"\nFound {self.count_torsion_classes()} {self.d}-torsion classes:")
+        for i, (tc, path) in enumerate(self.iter_torsion_classes(), 1):
             print(f"\n{self.d}-torsion Class {i}:")
             print(f"Subcategory: {string_from_modules(tc)}")
             print(f"Path in graph: {format_path(path)}")
@@ -237,7 +506,7 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
     # Menu option 3
     def display_compute_summand_maximal_tau_d_rigid_pair_menu(self):
         print(f"\nChoose {self.d}-torsion class to compute a summand maximal tau_{self.d}-rigid pair from :")
-        print(f"1. Choose from list of all {self.d}-torsion classes")
+        print(f"1. Choose from the list of all {self.d}-torsion classes, shown one page at a time")
         print(f"2. Input a {self.d}-torsion class manually")
         print("3. Back to main menu")
         return input("\nEnter your choice (1-3): ")
@@ -247,39 +516,52 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
             choice = self.display_compute_summand_maximal_tau_d_rigid_pair_menu()
             
             if choice == '1':
-                # Get all torsion classes
-                torsion_classes = self.get_all_torsion_classes()
-                
-                # Display them with numbers
-                print(f"\nComputing all {self.d}-torsion classes...")
-                print(f"\nFound {len(torsion_classes)} torsion classes:")
-                for i, (tc, path) in enumerate(torsion_classes, 1):
-                    print(f"\nTorsion Class {i}:")
-                    print(f"Subcategory: {string_from_modules(tc)}")
-                    print(f"Path in graph: {format_path(path)}")
-                
-                # Ask user to choose one
+                # Show the torsion classes one page at a time, so that the ones which are not shown are never enumerated
+                total = self._number_of_torsion_classes()
+                offset = 0
                 while True:
-                    try:
-                        choice = int(input(f"\nChoose a {self.d}-torsion class (1-{len(torsion_classes)}): "))
-                        if 1 <= choice <= len(torsion_classes):
-                            selected_class, selected_path = torsion_classes[choice - 1]
-                            print(f"\nYou selected the following {self.d}-torsion class U:")
-                            print(f"Subcategory: {string_from_modules(selected_class)}")
-                            print(f"Path in graph: {format_path(selected_path)}")
-
-                            M_U = ext_d_projective_modules(selected_class, self.simples, self.d, self.l, self.n)
-                            P_U = maximal_projective(M_U, self.projectives)
-                            
-                            print(f"\nThe summand maximal tau_{self.d}-rigid pair (M^U, P^U) is:\n")
-                            M_str, P_str = self._format_module_pair(M_U, P_U)
-                            print(f"M^U = {M_str}")
-                            print(f"P^U = {P_str}")
-                            break
+                    torsion_classes, next_offset = self.get_torsion_class_page(offset, TORSION_CLASS_PAGE_SIZE)
+                    print(f"\n{self.d}-torsion classes {offset + 1}-{offset + len(torsion_classes)} of {total}:")
+                    for i, (tc, path) in enumerate(torsion_classes, offset + 1):
+                        print(f"\nTorsion Class {i}:")
+                        print(f"Subcategory: {string_from_modules(tc)}")
+                        print(f"Path in graph: {format_path(path)}")
+
+                    # Ask user to choose one, or to move to another page
+                    answer = input(f"\nChoose a {self.d}-torsion class (1-{total}), or enter n for the next page, "
+                                   "b for the previous page or q to go back: ").strip().lower()
+                    if answer == 'q':
+                        break
+                    if answer == 'n':
+                        if next_offset is None:
+                            print("This is the last page")
                         else:
-                            print(f"Please enter a number between 1 and {len(torsion_classes)}")
+                            offset = next_offset
+                        continue
+                    if answer == 'b':
+                        offset = max(offset - TORSION_CLASS_PAGE_SIZE, 0)
+                        continue
+                    try:
+                        choice = int(answer)
                     except ValueError:
                         print("Please enter a valid number")
+                        continue
+                    if not 1 <= choice <= total:
+                        print(f"Please enter a number between 1 and {total}")
+                        continue
+
+                    selected_class, selected_path = self.get_torsion_class(choice - 1)
+                    print(f"\nYou selected the following {self.d}-torsion class U:")
+                    print(f"Subcategory: {string_from_modules(selected_class)}")
+                    print(f"Path in graph: {format_path(selected_path)}")
+
+                    M_U, P_U = self.compute_tau_d_rigid_pair(selected_class)
+
+                    print(f"\nThe summand maximal tau_{self.d}-rigid pair (M^U, P^U) is:\n")
+                    M_str, P_str = self._format_module_pair(M_U, P_U)
+                    print(f"M^U = {M_str}")
+                    print(f"P^U = {P_str}")
+                    break
                         
             elif choice == '2':                
                 print(f"\nEnter an additive generator of the {self.d}-torsion class in one of these formats:")
@@ -292,27 +574,20 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
                         modules = parse_module_input(input_str, self.n, self.l)
                         
                         # Check if this is a valid torsion class
-                        torsion_classes = self.get_all_torsion_classes()
-                        valid_torsion_class = False
-                        for tc, path in torsion_classes:
-                            if set(modules) == set(tc):
-                                valid_torsion_class = True
-                                selected_class = tc
-                                selected_path = path
-                                break
+                        selected_path = self.find_torsion_class_path(modules)
                         
-                        if not valid_torsion_class:
+                        if selected_path is None:
                             if not self._should_retry(f"This is not a valid {self.d}-torsion class"):
                                 break
                             continue
                         
                         # Valid torsion class found
+                        selected_class = from_path_to_d_torsion_class(self.G, selected_path, self.simples, self.l, self.d)
                         print(f"\nValid {self.d}-torsion class:")
                         print(f"Subcategory: {string_from_modules(selected_class)}")
                         print(f"Path in graph: {format_path(selected_path)}")
                             
-                        M_U = ext_d_projective_modules(selected_class, self.simples, self.d, self.l, self.n)
-                        P_U = maximal_projective(M_U, self.projectives)
+                        M_U, P_U = self.compute_tau_d_rigid_pair(selected_class)
                             
                         # Show the complete pair
                         print(f"\nThe summand maximal tau_{self.d}-rigid pair (M^U, P^U) is:\n")
@@ -359,15 +634,10 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
                     continue
                 
                 # tau_d-rigid found                
-                torsion_classes = self.get_all_torsion_classes()
-                min_tc = minimal_torsion_class(M_basic, torsion_classes)
+                minimal = self.find_minimal_torsion_class(M_basic)
                 
-                if min_tc is not None:
-                    min_path = None
-                    for tc, path in torsion_classes:
-                        if set(tc) == set(min_tc):
-                            min_path = path
-                            break
+                if minimal is not None:
+                    min_tc, min_path = minimal
                             
                     print(f"\nMinimal {self.d}-torsion class containing (M,P):")
                     print(f"Subcategory: {string_from_modules(min_tc)}")
@@ -446,6 +716,40 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
                     break
                 continue
     
+    # Menu option 9
+    def handle_torsion_class_search(self):
+        if self.torsion_class_index is None:
+            print(f"\nIndexing all {self.d}-torsion classes...")
+            torsion_class_index = self.build_torsion_class_index()
+            print(f"Indexed {len(torsion_class_index)} {self.d}-torsion classes in {torsion_class_index.build_time:.2f} seconds "
+                  f"using {torsion_class_index.memory_size() / 2**20:.2f} MB")
+
+        print(f"\nEnter the modules which the {self.d}-torsion classes contain and those which they do not contain in one of these formats:")
+        print("1. M-1-1,M-1-2,...")
+        print("2. M(1,1) ⊕ M(1,2) ⊕ ...")
+        print("(Use 0 or leave empty for no indecomposable modules)")
+
+        while True:
+            try:
+                contained = self.to_bitmask(parse_module_input(input("\nEnter contained modules: ").strip(), self.n, self.l))
+                excluded = self.to_bitmask(parse_module_input(input("Enter excluded modules: ").strip(), self.n, self.l))
+
+                ids = self.torsion_class_index.ids(self.torsion_class_index.matching(contained, excluded))
+                print(f"\nFound {len(ids)} {self.d}-torsion classes")
+                if ids:
+                    shown = ids[:10]
+                    print(f"The {len(shown)} smallest are:")
+                    for i in shown:
+                        print(f"\n{self.d}-torsion Class {i + 1}:")
+                        print(f"Subcategory: {string_from_modules(self.from_bitmask(self.torsion_class_index.torsion_classes[i]))}")
+
+                retry = input("\nSearch again? (y/n): ")
+                if retry.lower() != 'y':
+                    break
+            except ValueError as e:
+                if not self._should_retry(str(e)):
+                    break
+
     # Menu option 7
     def handle_format_conversion(self):
         print("\nEnter a module in one of these formats:")
@@ -488,7 +792,8 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
             '5': self.handle_check_tau_d_rigid_pair,
             '6': self.initialize,
             '7': self.handle_format_conversion,
-            '8': lambda: print("\nThank you! Bye!")
+            '8': lambda: print("\nThank you! Bye!"),
+            '9': self.handle_torsion_class_search
         }
         
         while True:
@@ -500,7 +805,7 @@ class HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator:
             if action:
                 action()
             else:
-                print("\nInvalid choice. Please select 1-8.")
+                print("\nInvalid choice. Please select 1-9.")
 
 if __name__ == "__main__":
     calculator = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator()
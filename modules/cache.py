@@ -0,0 +1,171 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+# Source files whose changes can change the enumeration, and so invalidate the cached results, relative to the root of the package
+VERSIONED_FILES = ("main.py", "modules/classes.py", "modules/functions.py", "modules/graph.py", "modules/graph_builder.py",
+                   "modules/helpers.py", "modules/solvers.py")
+
+# Header of a cache file: magic, fingerprint of the modules and edges, number of torsion classes, path length, number of bytes per bitmask
+HEADER = struct.Struct("<4s8sIII")
+MAGIC = b"DTC2"
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Compute a hash of the source code the enumeration depends on.
+
+    :return: A string of 16 hexadecimal digits.
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for name in VERSIONED_FILES:
+        with open(os.path.join(directory, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def layout_fingerprint(modules, edge_names):
+    """
+    Compute a fingerprint of the order of the modules of C, which gives the bits of the bitmasks, and of the edges of G, which gives the edge ids. Cached results are only used if their fingerprint agrees, so that they are never decoded with another order.
+
+    :param modules: List of the modules of C, in the order of the bits of the bitmasks.
+    :param edge_names: List of the names of the edges of G, in the order of their ids.
+    :return: 8 bytes.
+    """
+    digest = hashlib.sha256()
+    digest.update(";".join(f"{module.a},{module.b}" for module in modules).encode())
+    digest.update(b"|")
+    digest.update(";".join(edge_names).encode())
+    return digest.digest()[:8]
+
+def default_cache_directory():
+    """The directory given by the environment variable D_TORSION_CACHE_DIR, or None if it is not set"""
+    return os.environ.get("D_TORSION_CACHE_DIR") or None
+
+def write_records(path, edge_ids, bitmasks, path_length, width, fingerprint):
+    """
+    Write the enumeration results to a binary file. The file is written under a temporary name and then renamed, so that it is never read half written.
+
+    :param path: The file to write.
+    :param edge_ids: Array of the ids in G of the edges of all paths, one path after another.
+    :param bitmasks: List of bitmasks of the d-torsion classes.
+    :param path_length: The length p-1 of the paths.
+    :param width: The number of modules in C.
+    :param fingerprint: The layout_fingerprint of the modules and edges.
+    """
+    width_bytes = (width + 7) // 8
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    edge_ids = array("I", edge_ids)
+    if sys.byteorder == "big":
+        edge_ids.byteswap()
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(HEADER.pack(MAGIC, fingerprint, len(bitmasks), path_length, width_bytes))
+            f.write(edge_ids.tobytes())
+            f.write(b"".join(bitmask.to_bytes(width_bytes, "little") for bitmask in bitmasks))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+def read_records(path, fingerprint):
+    """
+    Read the enumeration results written by write_records.
+
+    :param path: The file to read.
+    :param fingerprint: The layout_fingerprint the results must have been written with.
+    :return: A tuple (edge_ids, bitmasks) as given to write_records.
+    :raises ValueError: If the file is not a valid cache file, or was written with another fingerprint.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"Cache file {path} is truncated")
+    magic, file_fingerprint, count, path_length, width_bytes = HEADER.unpack_from(data)
+    edge_ids_end = HEADER.size + 4 * count * path_length
+    if magic != MAGIC or len(data) != edge_ids_end + count * width_bytes:
+        raise ValueError(f"Cache file {path} is not valid")
+    if file_fingerprint != fingerprint:
+        raise ValueError(f"Cache file {path} was written for other modules or edges")
+    edge_ids = array("I")
+    edge_ids.frombytes(data[HEADER.size:edge_ids_end])
+    if sys.byteorder == "big":
+        edge_ids.byteswap()
+    bitmasks = [int.from_bytes(data[start:start + width_bytes], "little")
+                for start in range(edge_ids_end, len(data), width_bytes)]
+    return edge_ids, bitmasks
+
+class EnumerationCache:
+    def __init__(self, directory=None, max_memory=256 * 2**20):
+        """
+        Cache of the d-torsion classes of the algebras (d,l,p), as the edge ids of their paths and their bitmasks. The results are kept in memory, where the least recently used ones are evicted once they take more than max_memory bytes. If a directory is given, they are also kept in binary files named by (d,l,p) and the hash of the code, so that they are reused by later sessions and other processes.
+
+        :param directory: The directory of the cache files, by default default_cache_directory(). If it is None the results are only kept in memory.
+        :param max_memory: Approximate maximal number of bytes of the results kept in memory.
+        """
+        self.directory = directory or default_cache_directory()
+        self.max_memory = max_memory
+        self.version = code_version()
+        self.entries = OrderedDict()
+        self.memory = 0
+
+    def path(self, d, l, p):
+        """The cache file of the algebra (d,l,p), or None if the results are only kept in memory"""
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, f"d{d}_l{l}_p{p}_{self.version}.bin")
+
+    def _remember(self, key, records, fingerprint):
+        if key in self.entries:
+            self.memory -= self.entries.pop(key)[1]
+        edge_ids, bitmasks = records
+        size = edge_ids.itemsize * len(edge_ids) + sum(sys.getsizeof(bitmask) for bitmask in bitmasks)
+        self.entries[key] = (records, size, fingerprint)
+        self.memory += size
+        # Evict the least recently used results, but always keep the latest ones
+        while self.memory > self.max_memory and len(self.entries) > 1:
+            self.memory -= self.entries.popitem(last=False)[1][1]
+
+    def get(self, d, l, p, fingerprint):
+        """
+        Find the cached results of the algebra (d,l,p), in memory or on disk.
+
+        :param fingerprint: The layout_fingerprint of the modules and edges the results are decoded with.
+        :return: A tuple (edge_ids, bitmasks) as given to put, or None if there are no valid cached results with this fingerprint.
+        """
+        key = (d, l, p)
+        if key in self.entries and self.entries[key][2] == fingerprint:
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        if self.directory is None:
+            return None
+        try:
+            records = read_records(self.path(d, l, p), fingerprint)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, records, fingerprint)
+        return records
+
+    def put(self, d, l, p, edge_ids, bitmasks, width, fingerprint):
+        """
+        Store the results of the algebra (d,l,p) in memory, and on disk if the cache has a directory. If the cache file cannot be written the results are only kept in memory.
+
+        :param edge_ids: Array of the ids in G of the edges of all paths, one path after another.
+        :param bitmasks: List of bitmasks of the d-torsion classes.
+        :param width: The number of modules in C.
+        :param fingerprint: The layout_fingerprint of the modules and edges.
+        """
+        path_length = len(edge_ids) // len(bitmasks) if bitmasks else 0
+        if self.directory is not None:
+            try:
+                write_records(self.path(d, l, p), edge_ids, bitmasks, path_length, width, fingerprint)
+            except OSError:
+                pass
+        self._remember((d, l, p), (edge_ids, bitmasks), fingerprint)
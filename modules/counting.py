@@ -0,0 +1,231 @@
+def adjacency_matrices(G, odd_nodes, even_nodes):
+    """
+    Compute the odd/even adjacency matrices of the graph G=G(C), counting multiple edges.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param even_nodes: List of nodes which can appear in an even diagonal.
+    :return: A tuple (O, E) of matrices given as lists of lists of integers, where O[i][j] is the number of edges from odd_nodes[i] to even_nodes[j] and E[j][i] is the number of edges from even_nodes[j] to odd_nodes[i].
+    """
+    odd_position = {node: i for i, node in enumerate(odd_nodes)}
+    even_position = {node: j for j, node in enumerate(even_nodes)}
+    O = [[0] * len(even_nodes) for _ in odd_nodes]
+    E = [[0] * len(odd_nodes) for _ in even_nodes]
+
+    for u, label, v in G.edge_tuples:
+        if u in odd_position and v in even_position:
+            O[odd_position[u]][even_position[v]] += 1
+        if u in even_position and v in odd_position:
+            E[even_position[u]][odd_position[v]] += 1
+    return O, E
+
+def matrix_product(A, B):
+    """
+    Multiply two matrices with exact integer arithmetic.
+
+    :param A: Matrix given as a list of lists of integers.
+    :param B: Matrix given as a list of lists of integers.
+    :return: The matrix A*B.
+    """
+    columns = list(zip(*B))
+    return [[sum(x * y for x, y in zip(row, column)) for column in columns] for row in A]
+
+def matrix_power(A, exponent):
+    """
+    Raise a square matrix to a non-negative power by repeated squaring.
+
+    :param A: Square matrix given as a list of lists of integers.
+    :param exponent: A non-negative integer.
+    :return: The matrix A^exponent.
+    """
+    result = [[int(i == j) for j in range(len(A))] for i in range(len(A))]
+    while exponent > 0:
+        if exponent % 2 == 1:
+            result = matrix_product(result, A)
+        A = matrix_product(A, A)
+        exponent //= 2
+    return result
+
+def count_torsion_classes(G, odd_nodes, even_nodes, p):
+    """
+    Count the d-torsion classes without enumerating them. These correspond to the paths of length p-1 in G starting at an odd node, so their number is the sum of the entries of (OE)^((p-1)/2) when p is odd and of (OE)^((p-2)/2)O when p is even.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param even_nodes: List of nodes which can appear in an even diagonal.
+    :param p: The number of diagonals.
+    :return: The number of d-torsion classes.
+    """
+    O, E = adjacency_matrices(G, odd_nodes, even_nodes)
+    walks = matrix_power(matrix_product(O, E), (p - 1) // 2)
+    if (p - 1) % 2 == 1:
+        walks = matrix_product(walks, O)
+    return sum(sum(row) for row in walks)
+
+def path_counts(G, path_length):
+    """
+    Count the paths in G of every length up to a given one from every node, by dynamic programming on the remaining length.
+
+    :param G: The graph.
+    :param path_length: The maximal length of the paths, p-1 for the d-torsion classes.
+    :return: A list counts, where counts[k] is the list of the numbers of paths of length k starting at every node, by node id.
+    """
+    counts = [[1] * G.number_of_nodes()]
+    for k in range(1, path_length + 1):
+        counts.append([sum(counts[k - 1][G.edge_targets[edge]] for edge in edges) for edges in G.out_edges])
+    return counts
+
+def unrank_path(G, odd_nodes, counts, rank):
+    """
+    Find the path of a d-torsion class from its position in the enumeration, without enumerating the paths before it. At every node the edges are tried in the order of the depth first search, skipping the number of paths through every edge which comes before, which takes time p times the out-degree.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param counts: The output of path_counts for the length p-1.
+    :param rank: The position of the d-torsion class in the enumeration, starting from 0.
+    :return: The path as a list of (source, edge_label, target) tuples.
+    :raises ValueError: If there is no d-torsion class in that position.
+    """
+    path_length = len(counts) - 1
+    if rank < 0:
+        raise ValueError(f"There is no d-torsion class in position {rank}")
+    for node in odd_nodes:
+        node = G.node_ids[node]
+        if rank < counts[path_length][node]:
+            break
+        rank -= counts[path_length][node]
+    else:
+        raise ValueError(f"There is no d-torsion class in position {rank}")
+
+    path = []
+    for k in range(path_length, 0, -1):
+        for edge in G.out_edges[node]:
+            node = G.edge_targets[edge]
+            if rank < counts[k - 1][node]:
+                break
+            rank -= counts[k - 1][node]
+        path.append(G.edge_tuples[edge])
+    return path
+
+def iter_paths_from_rank(G, odd_nodes, counts, rank):
+    """
+    Iterate over the paths of the d-torsion classes in the order of the enumeration, starting from a given position. The first path is found by unrank_path, and the depth first search is then resumed from it, with one iterator over the outgoing edges for every node of the path, as in iter_paths_of_given_length_in_a_multigraph. Edges from which no path of the remaining length starts are skipped using the counts, so that every path takes time p times the out-degree at most.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param counts: The output of path_counts for the length p-1.
+    :param rank: The position of the first d-torsion class, starting from 0.
+    :return: A generator of paths, where each path is a list of (source, edge_label, target) tuples.
+    :raises ValueError: If there is no d-torsion class in that position.
+    """
+    path_length = len(counts) - 1
+    out_edges = G.out_edges
+    edge_targets = G.edge_targets
+    edge_tuples = G.edge_tuples
+    current_path = unrank_path(G, odd_nodes, counts, rank)
+
+    # Position the iterators just after the edges of the first path
+    edge_iterators = []
+    for source, label, target in current_path:
+        edge = G.edge_ids_by_label[label]
+        # The outgoing edges of a node have consecutive ids
+        edge_iterators.append(iter(range(edge + 1, out_edges[G.edge_sources[edge]].stop)))
+    start_node = current_path[0][0]
+    yield current_path[:]
+    current_path.pop()
+
+    for node in odd_nodes[odd_nodes.index(start_node):]:
+        if node != start_node:
+            edge_iterators = [iter(out_edges[G.node_ids[node]])]
+        while edge_iterators:
+            edge = next(edge_iterators[-1], None)
+            if edge is None:
+                # All edges from the last node have been used, so backtrack
+                edge_iterators.pop()
+                if current_path:
+                    current_path.pop()
+                continue
+
+            remaining = path_length - len(current_path) - 1
+            if not counts[remaining][edge_targets[edge]]:
+                continue
+            current_path.append(edge_tuples[edge])
+            if remaining == 0:
+                yield current_path[:]
+                current_path.pop()
+            else:
+                edge_iterators.append(iter(out_edges[edge_targets[edge]]))
+
+def rank_path(G, odd_nodes, counts, path):
+    """
+    Find the position in the enumeration of the d-torsion class of a path, which is the inverse of unrank_path.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param counts: The output of path_counts for the length p-1.
+    :param path: The path as a list of (source, edge_label, target) tuples.
+    :return: The position of the d-torsion class in the enumeration, starting from 0.
+    :raises ValueError: If the path does not correspond to a d-torsion class.
+    """
+    path_length = len(counts) - 1
+    if len(path) != path_length or path[0][0] not in odd_nodes:
+        raise ValueError("The path does not correspond to a d-torsion class")
+    rank = 0
+    for node in odd_nodes[:odd_nodes.index(path[0][0])]:
+        rank += counts[path_length][G.node_ids[node]]
+
+    node = path[0][0]
+    for k, (source, label, target) in zip(range(path_length, 0, -1), path):
+        if source != node:
+            raise ValueError("The path does not correspond to a d-torsion class")
+        node = target
+        edge = G.edge_ids_by_label.get(label)
+        if edge is None or G.edge_tuples[edge] != (source, label, target):
+            raise ValueError(f"There is no edge {label} from {source} to {target}")
+        for previous in G.out_edges[G.edge_sources[edge]]:
+            if previous == edge:
+                break
+            rank += counts[k - 1][G.edge_targets[previous]]
+    return rank
+
+def path_weight_distribution(G, odd_nodes, p, node_weights, edge_weights):
+    """
+    Count the paths of length p-1 in G starting at an odd node by their weight, where the weight of a path is the weight of its first node plus the weights of its edges. This is the transfer matrix method with polynomials in place of numbers, computed forwards from the first diagonal, so it takes time p times the size of G times the number of different weights.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param p: The number of diagonals.
+    :param node_weights: Dictionary from the odd nodes to their weight in the first diagonal.
+    :param edge_weights: List of p-1 dictionaries, where edge_weights[i] maps the ids of the edges to their weight between diagonals i+1 and i+2, including the weight of their target in diagonal i+2.
+    :return: Dictionary from the weights to the number of paths with that weight, sorted by weight.
+    """
+    distributions = {node: {node_weights[node]: 1} for node in odd_nodes}
+    for i in range(p - 1):
+        next_distributions = {}
+        for node, distribution in distributions.items():
+            for edge in G.out_edges[G.node_ids[node]]:
+                weight = edge_weights[i][edge]
+                next_distribution = next_distributions.setdefault(G.node_names[G.edge_targets[edge]], {})
+                for total, count in distribution.items():
+                    next_distribution[total + weight] = next_distribution.get(total + weight, 0) + count
+        distributions = next_distributions
+
+    result = {}
+    for distribution in distributions.values():
+        for total, count in distribution.items():
+            result[total] = result.get(total, 0) + count
+    return dict(sorted(result.items()))
+
+def size_distribution(G, odd_nodes, p):
+    """
+    Count the d-torsion classes by their number of indecomposable modules without enumerating them. Every node and edge of G contributes the same number of modules in every diagonal, given by its template.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param p: The number of diagonals.
+    :return: Dictionary from the sizes to the number of d-torsion classes of that size, sorted by size.
+    """
+    node_weights = {node: G.node_templates[G.node_ids[node]][1] for node in odd_nodes}
+    edge_weights = {edge: template[2] + G.node_templates[target][1]
+                    for edge, (template, target) in enumerate(zip(G.edge_templates, G.edge_targets))}
+    return path_weight_distribution(G, odd_nodes, p, node_weights, [edge_weights] * (p - 1))
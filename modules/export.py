@@ -0,0 +1,68 @@
+import csv
+import gzip
+import json
+from modules.helpers import bit_positions
+
+# Supported export formats and their file extensions
+EXPORT_FORMATS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+def export_format(filename):
+    """
+    Find the export format of a file from its extension, ignoring a final .gz.
+
+    :param filename: The name of the file.
+    :return: 'ndjson' or 'csv'.
+    :raises ValueError: If the extension is not one of EXPORT_FORMATS.
+    """
+    name = filename[:-3] if filename.endswith(".gz") else filename
+    for extension, file_format in EXPORT_FORMATS.items():
+        if name.endswith(extension):
+            return file_format
+    raise ValueError(f"Unknown export format of {filename}, use one of {', '.join(EXPORT_FORMATS)} with an optional .gz")
+
+def open_export_file(filename):
+    """Open a file for writing text, compressed with gzip if its name ends with .gz"""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "wt", encoding="utf-8", newline="")
+    return open(filename, "w", encoding="utf-8", newline="")
+
+def write_torsion_classes(f, records, file_format, modules, G, include_pairs=False):
+    """
+    Write d-torsion classes to a file as they are enumerated, one record per class, so that they are never all held in memory. Every record has the position of the class in the enumeration, the names of the edges of its path in G (such as "i" or "k0") and their ids, which also identify the edges when names repeat for large l, its size and its modules, and optionally its summand maximal tau_d-rigid pair (M^U, P^U). In NDJSON the lists are JSON arrays, in CSV they are joined by semicolons.
+
+    :param f: The file to write, opened in text mode.
+    :param records: Iterable of tuples (torsion_class, path, M_U, P_U) as given by iter_torsion_classes_parallel, where M_U and P_U are only used if include_pairs is True.
+    :param file_format: 'ndjson' or 'csv'.
+    :param modules: List of the modules in C.
+    :param G: The graph, giving the names and ids of the edges.
+    :param include_pairs: Whether to write M^U and P^U.
+    :return: The number of records written.
+    """
+    names = [f"M({module.a},{module.b})" for module in modules]
+    fields = ["id", "path", "edge_ids", "size", "modules"] + (["M_U", "P_U"] if include_pairs else [])
+
+    def to_names(bitmask):
+        return [names[i] for i in bit_positions(bitmask)]
+
+    if file_format == "ndjson":
+        def write(values):
+            f.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False))
+            f.write("\n")
+    elif file_format == "csv":
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        def write(values):
+            writer.writerow([";".join(map(str, value)) if isinstance(value, list) else value for value in values])
+    else:
+        raise ValueError(f"Unknown export format {file_format}")
+
+    count = 0
+    for i, (torsion_class, path, M_U, P_U) in enumerate(records):
+        torsion_class_names = to_names(torsion_class)
+        edge_ids = [G.edge_ids_by_label[label] for _, label, _ in path]
+        values = [i, [G.edge_names[edge] for edge in edge_ids], edge_ids, len(torsion_class_names), torsion_class_names]
+        if include_pairs:
+            values += [to_names(M_U), to_names(P_U)]
+        write(values)
+        count += 1
+    return count
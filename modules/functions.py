@@ -1,5 +1,5 @@
 from modules.classes import Module
-from modules.helpers import get_edge_by_label
+from modules.helpers import popcount, bit_positions, transpose_bitmasks
 
 def compute_modules_for_node(node, position, simples, l):
     """
@@ -51,7 +51,7 @@ def compute_modules_for_edge(edge, position, simples, l, d):
     """
     Compute the list of modules for a given node based on its position in the path.
 
-    :param edge: The edge name.
+    :param edge: The edge name, or an edge (u, v, key, data) as given by get_edge_by_label.
     :param position: The position of the edge in the path.
     :param simples: List of simple modules.
     :param l: The l in the algebra.
@@ -59,7 +59,7 @@ def compute_modules_for_edge(edge, position, simples, l, d):
     :return: A list of Module objects.
     """
     modules = []
-    name = edge[3].get('name')
+    name = edge if isinstance(edge, str) else edge[3].get('name')
     starting_base = simples[position - 1].a # The base of the diagonal the edge starts at
     ending_base = simples[position].a # The base of the diagonal the edge ends at
 
@@ -124,6 +124,33 @@ def compute_modules_for_edge(edge, position, simples, l, d):
                             return modules
     return modules
 
+def modules_from_node_template(template, base):
+    """
+    Compute the list of modules for a node from its template, see build_graph.
+
+    :param template: The template (start, count, direction) of the node.
+    :param base: The coordinate of the simple module of the diagonal.
+    :return: A list of Module objects.
+    """
+    start, count, direction = template
+    if direction == 1: # The first coordinate is constant
+        return [Module(base, base + start + j) for j in range(count)]
+    return [Module(base - start - j, base) for j in range(count)] # The second coordinate is constant
+
+def modules_from_edge_template(template, starting_base, ending_base, l):
+    """
+    Compute the list of modules for an edge from its template, see build_graph.
+
+    :param template: The template (anchor, offset, count, direction) of the edge.
+    :param starting_base: The coordinate of the simple module of the diagonal the edge starts at.
+    :param ending_base: The coordinate of the simple module of the diagonal the edge ends at.
+    :param l: The l in the algebra.
+    :return: A list of Module objects.
+    """
+    anchor, offset, count, direction = template
+    first = (ending_base if anchor else starting_base) + offset
+    return [Module(first + direction * j, first + direction * j + (l - 1)) for j in range(count)]
+
 def from_path_to_d_torsion_class(G, path, simples, l, d):
     """
     Compute the d-torsion class corresponding to a path in the graph G. No check is done to ensure the path is of the correct length or that it starts in an odd diagonal.
@@ -137,11 +164,167 @@ def from_path_to_d_torsion_class(G, path, simples, l, d):
     """
     modules = []
     for i in range(0, len(path)):
-        modules = (modules + compute_modules_for_node(path[i][0], i+1, simples, l)
-                  + compute_modules_for_edge(get_edge_by_label(G, path[i][1]), i+1, simples, l, d))
-    modules = modules + compute_modules_for_node(path[-1][2], len(path)+1, simples, l)
+        modules.extend(modules_from_node_template(G.node_templates[G.node_ids[path[i][0]]], simples[i].a))
+        modules.extend(modules_from_edge_template(G.edge_templates[G.edge_ids_by_label[path[i][1]]],
+                                                  simples[i].a, simples[i + 1].a, l))
+    modules.extend(modules_from_node_template(G.node_templates[G.node_ids[path[-1][2]]], simples[len(path)].a))
     return modules
 
+def block_module_lists(G, odd_nodes, even_nodes, simples, l):
+    """
+    Compute the lists of modules which the nodes and edges of the graph G contribute to a d-torsion class, in every diagonal where they can appear.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param even_nodes: List of nodes which can appear in an even diagonal.
+    :param simples: List of simple modules.
+    :param l: The l in the algebra.
+    :return: A tuple (node_lists, edge_lists), where node_lists[i] is a dictionary from the nodes to their modules in diagonal i+1, and edge_lists[i] is a dictionary from the edge labels to their modules between diagonals i+1 and i+2.
+    """
+    node_lists = []
+    edge_lists = []
+    for i in range(len(simples)):
+        nodes = odd_nodes if i % 2 == 0 else even_nodes
+        node_lists.append({node: modules_from_node_template(G.node_templates[G.node_ids[node]], simples[i].a) for node in nodes})
+        if i == len(simples) - 1:
+            continue
+        edge_lists.append({G.edge_labels[edge]: modules_from_edge_template(G.edge_templates[edge], simples[i].a, simples[i + 1].a, l)
+                           for node in nodes for edge in G.out_edges[G.node_ids[node]]})
+    return node_lists, edge_lists
+
+def from_path_to_d_torsion_class_by_blocks(path, node_lists, edge_lists):
+    """
+    Compute the d-torsion class corresponding to a path in the graph G from the precomputed lists of modules of its nodes and edges. The result is the same as for from_path_to_d_torsion_class.
+
+    :param path: The path in the graph.
+    :param node_lists: Lists of modules of the nodes in every diagonal, as in the output of block_module_lists.
+    :param edge_lists: Lists of modules of the edges between consecutive diagonals, as in the output of block_module_lists.
+    :return: List of modules forming the torsion class
+    """
+    modules = []
+    for i, (source, label, target) in enumerate(path):
+        modules.extend(node_lists[i][source])
+        modules.extend(edge_lists[i][label])
+    modules.extend(node_lists[len(path)][path[-1][2]])
+    return modules
+
+def iter_d_torsion_classes(G, start_node, simples, l, prefix=None):
+    """
+    Iterate over the d-torsion classes corresponding to the paths in the graph G of length p-1 starting at a given node, where p is the number of simple modules. The modules are built up along an iterative depth first search over the edge ids of G: the block of modules of an edge and its target node is pushed when the edge is added to the path and popped when backtracking, so that paths with a common prefix share the work for that prefix. The blocks are computed the first time an edge is used between two diagonals, and are shared by the torsion classes.
+
+    :param G: The graph.
+    :param start_node: The starting node of the paths, which should be an odd node.
+    :param simples: List of simple modules.
+    :param l: The l in the algebra.
+    :param prefix: Optional path starting at start_node, as a list of (source, edge_label, target) tuples. If given, only the paths extending it are considered.
+    :return: A generator of tuples (torsion_class, path), in the same order as find_paths_of_given_length_in_a_multigraph.
+    """
+    path_length = len(simples) - 1
+    out_edges = G.out_edges
+    edge_targets = G.edge_targets
+    edge_tuples = G.edge_tuples
+    # The modules of every edge together with its target node, when the edge goes from diagonal i+1 to diagonal i+2, or None if the edge has not been used there yet
+    step_modules = [[None] * G.number_of_edges() for _ in range(path_length)]
+
+    def step(i, edge):
+        block = step_modules[i][edge]
+        if block is None:
+            block = (modules_from_edge_template(G.edge_templates[edge], simples[i].a, simples[i + 1].a, l)
+                     + modules_from_node_template(G.node_templates[edge_targets[edge]], simples[i + 1].a))
+            step_modules[i][edge] = block
+        return block
+
+    last_node = G.node_ids[start_node]
+    current_modules = modules_from_node_template(G.node_templates[last_node], simples[0].a)
+    current_path = []
+    for i, (source, label, target) in enumerate(prefix or []):
+        edge = G.edge_ids_by_label[label]
+        current_modules.extend(step(i, edge))
+        current_path.append(edge_tuples[edge])
+        last_node = edge_targets[edge]
+    if len(current_path) == path_length:
+        yield current_modules, current_path
+        return
+
+    block_sizes = [] # Number of modules pushed for each edge added to the current path
+    edge_iterators = [iter(out_edges[last_node])]
+
+    while edge_iterators:
+        edge = next(edge_iterators[-1], None)
+        if edge is None:
+            # All edges from the last node have been used, so backtrack
+            edge_iterators.pop()
+            if block_sizes:
+                current_path.pop()
+                del current_modules[len(current_modules) - block_sizes.pop():]
+            continue
+
+        block = step(len(current_path), edge)
+        current_path.append(edge_tuples[edge])
+        if len(current_path) == path_length:
+            yield current_modules + block, current_path[:]
+            current_path.pop()
+        else:
+            current_modules.extend(block)
+            block_sizes.append(len(block))
+            edge_iterators.append(iter(out_edges[edge_targets[edge]]))
+
+def iter_d_torsion_class_bitmasks(G, start_node, node_blocks, edge_blocks, prefix=None):
+    """
+    Iterate over the d-torsion classes corresponding to the paths in the graph G of length p-1 starting at a given node as compact records, in the same order as iter_d_torsion_classes. The bitmask of the torsion class is built up along the depth first search from the bitmasks of the blocks, so that no modules are created.
+
+    :param G: The graph.
+    :param start_node: The starting node of the paths, which should be an odd node.
+    :param node_blocks: Bitmasks of the nodes in every diagonal, as in the output of torsion_class_blocks.
+    :param edge_blocks: Bitmasks of the edges between consecutive diagonals, as in the output of torsion_class_blocks.
+    :param prefix: Optional path starting at start_node, as a list of (source, edge_label, target) tuples. If given, only the paths extending it are considered.
+    :return: A generator of tuples (edge_ids, torsion_class), where edge_ids is the tuple of the ids of the edges of the path and torsion_class is the bitmask over the indexed C.
+    """
+    path_length = len(edge_blocks)
+    out_edges = G.out_edges
+    edge_targets = G.edge_targets
+    # The bitmask of every edge together with its target node, when the edge goes from diagonal i+1 to diagonal i+2
+    step_blocks = []
+    for i, blocks in enumerate(edge_blocks):
+        step_blocks.append([0] * G.number_of_edges())
+        for edge, block in blocks.items():
+            step_blocks[i][edge] = block | node_blocks[i + 1][G.node_names[edge_targets[edge]]]
+
+    last_node = G.node_ids[start_node]
+    bitmask = node_blocks[0][start_node]
+    current_path = []
+    for i, (source, label, target) in enumerate(prefix or []):
+        edge = G.edge_ids_by_label[label]
+        bitmask |= step_blocks[i][edge]
+        current_path.append(edge)
+        last_node = edge_targets[edge]
+    if len(current_path) == path_length:
+        yield tuple(current_path), bitmask
+        return
+
+    previous_bitmasks = [] # Bitmask before each edge added to the current path
+    edge_iterators = [iter(out_edges[last_node])]
+
+    while edge_iterators:
+        edge = next(edge_iterators[-1], None)
+        if edge is None:
+            # All edges from the last node have been used, so backtrack
+            edge_iterators.pop()
+            if previous_bitmasks:
+                current_path.pop()
+                bitmask = previous_bitmasks.pop()
+            continue
+
+        i = len(current_path)
+        current_path.append(edge)
+        if i + 1 == path_length:
+            yield tuple(current_path), bitmask | step_blocks[i][edge]
+            current_path.pop()
+        else:
+            previous_bitmasks.append(bitmask)
+            bitmask |= step_blocks[i][edge]
+            edge_iterators.append(iter(out_edges[edge_targets[edge]]))
+
 def minimal_torsion_class(modules_collection, torsion_classes):
     """
     Find the minimal torsion class containing a given collection of modules.
@@ -166,6 +349,76 @@ def minimal_torsion_class(modules_collection, torsion_classes):
 
     return minimal_tc
 
+def minimal_torsion_class_bitmask(bitmask, torsion_class_bitmasks):
+    """
+    Find the minimal torsion class containing a given collection of modules, with all collections given as bitmasks over the indexed d-cluster tilting subcategory.
+
+    :param bitmask: Bitmask of a collection of modules inside the d-cluster tilting subcategory.
+    :param torsion_class_bitmasks: A list of bitmasks of d-torsion classes.
+    :return: The position in torsion_class_bitmasks of the first minimal torsion class containing the collection, or None if no such class exists.
+    """
+    minimal_position = None
+    minimal_size = None
+
+    for position, tc_bitmask in enumerate(torsion_class_bitmasks):
+        # Check if the collection is a subset of the current torsion class
+        if bitmask & ~tc_bitmask == 0:
+            size = popcount(tc_bitmask)
+            # Update the minimal torsion class if this one is smaller
+            if minimal_size is None or size < minimal_size:
+                minimal_position = position
+                minimal_size = size
+
+    return minimal_position
+
+def index_torsion_classes(torsion_class_bitmasks, width):
+    """
+    Build an inverted index from the modules of the d-cluster tilting subcategory to the torsion classes containing them. The torsion classes are ranked by size and then by position, so that the first set bit of a bitmask over the ranks is a minimal torsion class.
+
+    :param torsion_class_bitmasks: A list of bitmasks of d-torsion classes.
+    :param width: The number of modules in the d-cluster tilting subcategory.
+    :return: A tuple (order, classes_containing), where order[r] is the position in torsion_class_bitmasks of the torsion class of rank r, and bit r of classes_containing[i] is set if the torsion class of rank r contains module i.
+    """
+    order = sorted(range(len(torsion_class_bitmasks)), key=lambda position: popcount(torsion_class_bitmasks[position]))
+    classes_containing = transpose_bitmasks([torsion_class_bitmasks[position] for position in order], width)
+    return order, classes_containing
+
+def matching_torsion_classes_indexed(order, classes_containing, contained=0, excluded=0):
+    """
+    Find the torsion classes containing a collection of modules and none of another collection by intersecting the bitmasks of the torsion classes containing, respectively not containing, every module of the collections.
+
+    :param order: The ranking of the torsion classes, as in the output of index_torsion_classes.
+    :param classes_containing: The inverted index, as in the output of index_torsion_classes.
+    :param contained: Bitmask of the modules which the torsion classes contain.
+    :param excluded: Bitmask of the modules which the torsion classes do not contain.
+    :return: Bitmask over the ranks of the matching torsion classes.
+    """
+    candidates = (1 << len(order)) - 1
+    for i in bit_positions(contained):
+        candidates &= classes_containing[i]
+        if not candidates:
+            return 0
+    for i in bit_positions(excluded):
+        candidates &= ~classes_containing[i]
+        if not candidates:
+            return 0
+    return candidates
+
+def minimal_torsion_class_indexed(bitmask, order, classes_containing, excluded=0):
+    """
+    Find the minimal torsion class containing a given collection of modules, and optionally none of another collection, with the inverted index of the torsion classes.
+
+    :param bitmask: Bitmask of a collection of modules inside the d-cluster tilting subcategory.
+    :param order: The ranking of the torsion classes, as in the output of index_torsion_classes.
+    :param classes_containing: The inverted index, as in the output of index_torsion_classes.
+    :param excluded: Bitmask of the modules which the torsion class does not contain.
+    :return: The position in the indexed list of the first minimal torsion class containing the collection, or None if no such class exists.
+    """
+    candidates = matching_torsion_classes_indexed(order, classes_containing, bitmask, excluded)
+    if not candidates:
+        return None
+    return order[(candidates & -candidates).bit_length() - 1]
+
 def tau_d(module, d, l):
     """
     Compute the tau_d of a module M = (a, b). As d is even or l is equal to 2, only one formula is needed. Note that this code does not work if d is odd and l > 2 as there is a different formula in that case.
@@ -259,7 +512,7 @@ def ext_d_is_zero(module_a, module_b, simples, d, l, n):
 
 def ext_d_projective_modules(U, simples, d, l, n):
     """
-    Find all Ext^d-projective modules in the subcategory U of C.
+    Find all Ext^d-projective modules in the subcategory U of C. As Ext^d(A,B) can only be nonzero if A is not projective, B is not injective and A lies in the diagonal after B, every module is only compared with the modules of U in the previous diagonal.
     
     :param U: A collection (list) of modules inside.
     :param simples: List of simple modules.
@@ -267,14 +520,21 @@ def ext_d_projective_modules(U, simples, d, l, n):
     :param n: The n parameter from the algebra.
     :return: A list of all Ext^d-projective modules.
     """
+    # Group the non-injective modules of U by diagonal
+    non_injective_by_diagonal = {}
+    for module_b in U:
+        if not is_injective(module_b, n, l):
+            non_injective_by_diagonal.setdefault(get_diagonal(module_b, simples), []).append(module_b)
+
     ext_d_projective_modules = []
 
     for module_a in U:
-        is_projective = all(
-            ext_d_is_zero(module_a, module_b, simples, d, l, n) 
-            for module_b in U if module_b != module_a
+        is_projective_in_U = is_projective(module_a, l) or all(
+            ext_d_is_zero(module_a, module_b, simples, d, l, n)
+            for module_b in non_injective_by_diagonal.get(get_diagonal(module_a, simples) - 1, [])
+            if module_b != module_a
         )
-        if is_projective:
+        if is_projective_in_U:
             ext_d_projective_modules.append(module_a)
     return ext_d_projective_modules
 
@@ -0,0 +1,130 @@
+from array import array
+
+class MultiGraph:
+    def __init__(self):
+        """
+        Directed multigraph whose nodes and edges are numbered by integer ids, with their attributes stored in lists indexed by the ids, so that the depth first searches over G(C) only do list lookups. Nodes are numbered in the order they are added. Edges are numbered by their source node and then by their target node, in the order in which the first edge to every target was added, which is the order of G.edges(keys=True) of a NetworkX MultiDiGraph with the same nodes and edges. The edges of every node then have consecutive ids, and these are also the order in which the depth first searches try them.
+
+        Nodes have the attributes label and template, edges the attributes label, name and template, see build_graph. The edge labels are unique, so that paths can be given by their labels.
+        """
+        # Nodes by id
+        self.node_names = []
+        self.node_labels = []
+        self.node_templates = []
+        # Dictionary from the node names to their ids
+        self.node_ids = {}
+
+        # Edges added to every node by target node, as tuples (label, name, template), before they are numbered
+        self._adjacency = []
+        self._indexed = False
+
+    def add_node(self, name, label, template):
+        """Add a node and return its id"""
+        if name in self.node_ids:
+            raise ValueError(f"Node {name} already exists")
+        self.node_ids[name] = len(self.node_names)
+        self.node_names.append(name)
+        self.node_labels.append(label)
+        self.node_templates.append(template)
+        self._adjacency.append({})
+        self._indexed = False
+        return self.node_ids[name]
+
+    def add_edge(self, source, target, label, name, template):
+        """Add an edge between two nodes given by their names"""
+        self._adjacency[self.node_ids[source]].setdefault(self.node_ids[target], []).append((label, name, template))
+        self._indexed = False
+
+    def _index_edges(self):
+        # Edges by id
+        self._edge_sources = array('I')
+        self._edge_targets = array('I')
+        self._edge_labels = []
+        self._edge_names = []
+        self._edge_templates = []
+        # Ids of the outgoing edges of every node, which are consecutive
+        self._out_edges = []
+        for source, targets in enumerate(self._adjacency):
+            first = len(self._edge_labels)
+            for target, edges in targets.items():
+                for label, name, template in edges:
+                    self._edge_sources.append(source)
+                    self._edge_targets.append(target)
+                    self._edge_labels.append(label)
+                    self._edge_names.append(name)
+                    self._edge_templates.append(template)
+            self._out_edges.append(range(first, len(self._edge_labels)))
+
+        self._edge_ids_by_label = {}
+        for edge_id, label in enumerate(self._edge_labels):
+            if label in self._edge_ids_by_label:
+                raise ValueError(f"Edge label {label} is not unique")
+            self._edge_ids_by_label[label] = edge_id
+        self._edge_tuples = [(self.node_names[source], label, self.node_names[target])
+                             for source, label, target in zip(self._edge_sources, self._edge_labels, self._edge_targets)]
+        self._indexed = True
+
+    def _edge_data(self, attribute):
+        if not self._indexed:
+            self._index_edges()
+        return getattr(self, attribute)
+
+    @property
+    def out_edges(self):
+        """List of the ranges of ids of the outgoing edges of every node, by node id"""
+        return self._edge_data('_out_edges')
+
+    @property
+    def edge_sources(self):
+        """Array of the ids of the source nodes of the edges, by edge id"""
+        return self._edge_data('_edge_sources')
+
+    @property
+    def edge_targets(self):
+        """Array of the ids of the target nodes of the edges, by edge id"""
+        return self._edge_data('_edge_targets')
+
+    @property
+    def edge_labels(self):
+        """List of the labels of the edges, by edge id"""
+        return self._edge_data('_edge_labels')
+
+    @property
+    def edge_names(self):
+        """List of the names of the edges, by edge id"""
+        return self._edge_data('_edge_names')
+
+    @property
+    def edge_templates(self):
+        """List of the templates of the edges, by edge id"""
+        return self._edge_data('_edge_templates')
+
+    @property
+    def edge_ids_by_label(self):
+        """Dictionary from the labels of the edges to their ids"""
+        return self._edge_data('_edge_ids_by_label')
+
+    @property
+    def edge_tuples(self):
+        """List of the edges as (source, edge_label, target) tuples of names, as in paths, by edge id"""
+        return self._edge_data('_edge_tuples')
+
+    def number_of_nodes(self):
+        return len(self.node_names)
+
+    def number_of_edges(self):
+        return len(self.edge_labels)
+
+    def to_networkx(self):
+        """
+        Convert the graph to a NetworkX MultiDiGraph with the same nodes, edges and attributes, for display and export. NetworkX is only needed for this.
+
+        :return: The MultiDiGraph, whose G.edges(keys=True) are in the order of the edge ids.
+        """
+        import networkx as nx
+        H = nx.MultiDiGraph()
+        for name, label, template in zip(self.node_names, self.node_labels, self.node_templates):
+            H.add_node(name, label=label, template=template)
+        for (source, label, target), name, template in zip(self.edge_tuples, self.edge_names, self.edge_templates):
+            H.add_edge(source, target, label=label, name=name, template=template)
+        return H
@@ -1,4 +1,4 @@
-import networkx as nx
+from modules.graph import MultiGraph
 
 def build_graph(l, d):
     """
@@ -10,13 +10,17 @@ def build_graph(l, d):
         3. up or down arrows, for the orientation of the modules in the diagonal
     
     Edges: they are directed between two vertices, with a label indicating the amount of such edges. The label corresponds to the collection of modules between the two diagonals corresponding to the start and end of the directed edge which is included in the d-torsion class.
+
+    Every vertex and edge carries a template attribute describing its modules relative to the simple modules at the base of the diagonals:
+        1. Vertices have template (start, count, direction). The modules are M(base, base+start+j) if direction is 1 and M(base-start-j, base) if direction is -1, for 0 <= j < count.
+        2. Edges have template (anchor, offset, count, direction), where anchor is 0 for the starting diagonal and 1 for the ending diagonal. The modules are M(c, c+l-1) with c = base+offset+direction*j, for 0 <= j < count.
     
     :param l: The l in A(n,l).
     :param d: The d in the d-cluster tilting subcategory.
-    :return: A NetworkX MultiDiGraph object representing the directed multigraph which describes the d-torsion classes.
+    :return: A tuple (G, odd_nodes, even_nodes), where G is the MultiGraph which describes the d-torsion classes, and odd_nodes and even_nodes are the lists of nodes which can appear in an odd, respectively even, diagonal.
     """
     # Create the graph
-    G = nx.MultiDiGraph()
+    G = MultiGraph()
 
     # Lists to store node names
     odd_nodes_list = []
@@ -24,67 +28,64 @@ def build_graph(l, d):
 
     # The case l==2 is special
     if l==2:
-        G.add_node("DEmpty", label="$\\mathcal{D}^{\\downarrow}(0)$")
+        G.add_node("DEmpty", label="$\\mathcal{D}^{\\downarrow}(0)$", template=(0, 0, 1))
         even_nodes_list.append("DEmpty")
         odd_nodes_list.append("DEmpty")
-        G.add_node("DFull", label="$\\mathcal{D}$")
+        G.add_node("DFull", label="$\\mathcal{D}$", template=(0, 1, 1))
         even_nodes_list.append("DFull")
         odd_nodes_list.append("DFull")
 
-        G.add_edge("DEmpty", "DEmpty", label="$\\gamma$", name="g")
-        G.add_edge("DFull", "DFull", label="$\\epsilon$", name="e")
-        G.add_edge("DFull", "DEmpty", label="$\\beta$", name="b")
+        G.add_edge("DEmpty", "DEmpty", label="$\\gamma$", name="g", template=(0, 0, 0, 1))
+        G.add_edge("DFull", "DFull", label="$\\epsilon$", name="e", template=(0, 0, d, 1))
+        G.add_edge("DFull", "DEmpty", label="$\\beta$", name="b", template=(0, 0, 0, 1))
         for h in range(0,d+1):
-            G.add_edge("DEmpty", "DFull", label=f"$\\delta_{{{h}}}$", name=f"d{h}")
+            G.add_edge("DEmpty", "DFull", label=f"$\\delta_{{{h}}}$", name=f"d{h}", template=(1, 1 - l, h, -1))
     else:
-        G.add_node("DEvenFull", label="$\\mathcal{D}_{2t}$")
+        max_odd = (d - 2) * l // 2 + 2 # Total number of modules between an odd diagonal and the next one
+        max_even = d * l // 2 # Total number of modules between an even diagonal and the next one
+
+        G.add_node("DEvenFull", label="$\\mathcal{D}_{2t}$", template=(0, l - 1, -1))
         even_nodes_list.append("DEvenFull")
-        G.add_node("DEvenEmpty", label="$\\mathcal{D}_{2t}^{\\downarrow}(0)$")
+        G.add_node("DEvenEmpty", label="$\\mathcal{D}_{2t}^{\\downarrow}(0)$", template=(0, 0, -1))
         even_nodes_list.append("DEvenEmpty")
         for h in range(1, l - 1):
-            G.add_node(f"DEven{h}", label=f"$\\mathcal{{D}}^{{\\downarrow}}_{{2t}}({h})$")
+            G.add_node(f"DEven{h}", label=f"$\\mathcal{{D}}^{{\\downarrow}}_{{2t}}({h})$", template=(0, h, -1))
             even_nodes_list.append(f"DEven{h}")
-        G.add_node("DOddFull", label="$\\mathcal{D}_{2t+1}$")
+        G.add_node("DOddFull", label="$\\mathcal{D}_{2t+1}$", template=(0, l - 1, 1))
         odd_nodes_list.append("DOddFull")
-        G.add_node("DOddOne", label="$\\mathcal{D}_{2t+1}^{\\downarrow}(1)$")
+        G.add_node("DOddOne", label="$\\mathcal{D}_{2t+1}^{\\downarrow}(1)$", template=(0, 1, 1))
         odd_nodes_list.append("DOddOne")
-        G.add_node("DOddEmpty", label="$\\mathcal{D}_{2t+1}^{\\downarrow}(0)$")
+        G.add_node("DOddEmpty", label="$\\mathcal{D}_{2t+1}^{\\downarrow}(0)$", template=(0, 0, 1))
         odd_nodes_list.append("DOddEmpty")
         for h in range(2, l):
-            G.add_node(f"DOdd{h}", label=f"$\\mathcal{{D}}_{{2t+1}}({h})$")
+            G.add_node(f"DOdd{h}", label=f"$\\mathcal{{D}}_{{2t+1}}({h})$", template=(h - 1, l - h, 1))
             odd_nodes_list.append(f"DOdd{h}")
 
-        G.add_edge("DEvenFull", "DOddFull", label="$\\iota^{-}$", name="i-")
-        G.add_edge("DEvenFull", "DOddEmpty", label="$\\beta^{-}$", name="b-")
-        G.add_edge("DEvenEmpty", "DOddEmpty", label="$\\gamma^{-}$", name="g-")
-        G.add_edge("DEvenEmpty", "DOddOne", label="$\\eta^{-}$", name="h-")
+        G.add_edge("DEvenFull", "DOddFull", label="$\\iota^{-}$", name="i-", template=(0, 2 - l, max_even, 1))
+        G.add_edge("DEvenFull", "DOddEmpty", label="$\\beta^{-}$", name="b-", template=(0, 0, 0, 1))
+        G.add_edge("DEvenEmpty", "DOddEmpty", label="$\\gamma^{-}$", name="g-", template=(0, 0, 0, 1))
+        G.add_edge("DEvenEmpty", "DOddOne", label="$\\eta^{-}$", name="h-", template=(0, 0, 0, 1))
         for h in range(0, int((d / 2) * l + 1)):
-            G.add_edge("DEvenEmpty", "DOddFull", label=f"$\\kappa_{h}$", name=f"k{h}")
+            G.add_edge("DEvenEmpty", "DOddFull", label=f"$\\kappa_{h}$", name=f"k{h}", template=(1, -1, h, -1))
         for h in range(2, l):
-            G.add_edge(f"DOdd{h}", "DEvenFull", label=f"$\\epsilon_{h}$", name=f"e{h}")
+            G.add_edge(f"DOdd{h}", "DEvenFull", label=f"$\\epsilon_{h}$", name=f"e{h}", template=(0, 0, max_odd, 1))
             for k in range(0, l - h + 1):
-                G.add_edge("DEvenEmpty", f"DOdd{h}", label=f"$\\zeta_{{{h},{k}}}$", name=f"z{h}{k}")
+                G.add_edge("DEvenEmpty", f"DOdd{h}", label=f"$\\zeta_{{{h},{k}}}$", name=f"z{h}{k}", template=(1, -1, k, -1))
         for h in range(1, l - 1):
-            G.add_edge(f"DEven{h}", "DOddOne", label=f"$\\theta_{h}$", name=f"8{h}")
-            G.add_edge(f"DEven{h}", "DOddEmpty", label=f"$\\delta^{{-}}_{h}$", name=f"d-{h}")
-            G.add_edge("DOddEmpty", f"DEven{h}", label=f"$\\delta_{h}$", name=f"d{h}")
+            G.add_edge(f"DEven{h}", "DOddOne", label=f"$\\theta_{h}$", name=f"8{h}", template=(0, 0, 0, 1))
+            G.add_edge(f"DEven{h}", "DOddEmpty", label=f"$\\delta^{{-}}_{h}$", name=f"d-{h}", template=(0, 0, 0, 1))
+            G.add_edge("DOddEmpty", f"DEven{h}", label=f"$\\delta_{h}$", name=f"d{h}", template=(0, 0, 0, 1))
             for k in range(0, l - h):
-                G.add_edge(f"DEven{h}", "DOddFull", label=f"$\\lambda_{{{h},{k}}}$", name=f"l{h}{k}")
-        G.add_edge("DOddOne", "DEvenEmpty", label="$\\eta$", name="h")
-        G.add_edge("DOddFull", "DEvenFull", label="$\\iota$", name="i")
-        G.add_edge("DOddEmpty", "DEvenEmpty", label="$\\gamma$", name="g")
+                G.add_edge(f"DEven{h}", "DOddFull", label=f"$\\lambda_{{{h},{k}}}$", name=f"l{h}{k}", template=(1, -1, max_even - (l - 1) + h + k, -1))
+        G.add_edge("DOddOne", "DEvenEmpty", label="$\\eta$", name="h", template=(0, 0, 0, 1))
+        G.add_edge("DOddFull", "DEvenFull", label="$\\iota$", name="i", template=(0, 0, max_odd, 1))
+        G.add_edge("DOddEmpty", "DEvenEmpty", label="$\\gamma$", name="g", template=(0, 0, 0, 1))
         for h in range(0, int(((d - 2) / 2 * l) + 3)):
-            G.add_edge("DOddEmpty", "DEvenFull", label=f"$\\beta_{h}$", name=f"b{h}")
+            G.add_edge("DOddEmpty", "DEvenFull", label=f"$\\beta_{h}$", name=f"b{h}", template=(1, 1 - l, h, -1))
         if d==2:
             for h in range(1, l-2):
                 for k in range(2, l-h):
                     for m in range(0, l-(h+k)):
-                        G.add_edge(f"DEven{h}", f"DOdd{k}", label=f"$\\mu_{{{h},{m}}}^{{{k}}}$", name=f"m{h}{m}{k}")
-
-    # Get the list of nodes with their attributes
-    nodes = [(node, data) for node, data in G.nodes(data=True)]
-
-    # Get the list of edges with attributes
-    edges = [(u, v, key, data) for u, v, key, data in G.edges(keys=True, data=True)]
+                        G.add_edge(f"DEven{h}", f"DOdd{k}", label=f"$\\mu_{{{h},{m}}}^{{{k}}}$", name=f"m{h}{m}{k}", template=(1, -1, max_even - (l - 1) + h + m, -1))
 
-    return G, nodes, edges, odd_nodes_list, even_nodes_list
\ No newline at end of file
+    return G, odd_nodes_list, even_nodes_list
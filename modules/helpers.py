@@ -2,42 +2,133 @@ from modules.classes import Module
 
 def get_edge_by_label(graph, label):
     """
-    Find the edge in a graph given its label.
+    Find the edge in a graph given its label. For a MultiGraph the edge ids by label are used instead of scanning all edges, and a NetworkX MultiDiGraph, such as the one given by MultiGraph.to_networkx, is scanned.
 
-    :param graph: A NetworkX MultiDiGraph.
+    :param graph: A MultiGraph or a NetworkX MultiDiGraph.
     :param label: The label of the edge to search for.
-    :return: A tuple (u, v, key, data) representing the edge, or None if no match is found.
+    :return: A tuple (u, v, key, data) representing the edge, where key is the edge id for a MultiGraph and data is the dictionary of its label, name and template, or None if no match is found.
     """
+    if hasattr(graph, 'edge_ids_by_label'):
+        edge = graph.edge_ids_by_label.get(label)
+        if edge is None:
+            return None
+        u, label, v = graph.edge_tuples[edge]
+        return u, v, edge, {'label': label, 'name': graph.edge_names[edge], 'template': graph.edge_templates[edge]}
+
     for u, v, key, data in graph.edges(keys=True, data=True):
         if data.get('label') == label:
-            return u, v, key, data 
+            return u, v, key, data
     return None
 
+def iter_paths_of_given_length_in_a_multigraph(graph, start_node, path_length):
+    """
+    Iterate over all directed paths of a given length in a multigraph, considering different edges as separate paths. The depth first search is iterative and shares a single stack, so only one path is held in memory at a time.
+
+    :param graph: A MultiGraph.
+    :param start_node: The starting node of the paths.
+    :param path_length: The desired length of the paths.
+    :return: A generator of paths, where each path is a list of (source, edge_label, target) tuples.
+    """
+    if path_length == 0:
+        yield []
+        return
+
+    out_edges = graph.out_edges
+    edge_targets = graph.edge_targets
+    edge_tuples = graph.edge_tuples
+    current_path = []
+    # One iterator over the outgoing edges for every node in the current path
+    edge_iterators = [iter(out_edges[graph.node_ids[start_node]])]
+
+    while edge_iterators:
+        edge = next(edge_iterators[-1], None)
+        if edge is None:
+            # All edges from the last node have been used, so backtrack
+            edge_iterators.pop()
+            if current_path:
+                current_path.pop()
+            continue
+
+        current_path.append(edge_tuples[edge])
+        if len(current_path) == path_length:
+            yield current_path[:]
+            current_path.pop()
+        else:
+            edge_iterators.append(iter(out_edges[edge_targets[edge]]))
+
 def find_paths_of_given_length_in_a_multigraph(graph, start_node, path_length):
     """
     Find all directed paths of a given length in a multigraph, considering different edges as separate paths.
     
-    :param graph: A NetworkX directed multigraph.
+    :param graph: A MultiGraph.
     :param start_node: The starting node of the paths.
     :param path_length: The desired length of the paths.
     :return: A list of paths, where each path is a list of (source, edge_label, target) tuples.
     """
-    paths = []
+    return list(iter_paths_of_given_length_in_a_multigraph(graph, start_node, path_length))
 
-    def dfs(current_path, current_node):
-        # If the path reaches the desired length, add it to the results
-        if len(current_path) == path_length:
-            paths.append(current_path[:])
-            return
+def modules_to_bitmask(module_list, module_index):
+    """
+    Convert a list of modules to an integer bitmask over an indexed collection of modules.
 
-        # Get all outgoing edges from the current node
-        for _, neighbor, key, data in graph.out_edges(current_node, keys=True, data=True):
-            edge_label = data['label']  # Extract the edge label
-            dfs(current_path + [(current_node, edge_label, neighbor)], neighbor)
+    :param module_list: List of Module objects
+    :param module_index: Dictionary from Module objects to their position in the indexed collection
+    :return: Integer whose bit i is set if and only if the module at position i is in module_list
+    """
+    bitmask = 0
+    for module in module_list:
+        if module not in module_index:
+            raise ValueError(f"Module M({module.a},{module.b}) is not in the d-cluster tilting subcategory")
+        bitmask |= 1 << module_index[module]
+    return bitmask
 
-    # Start DFS from the start_node
-    dfs([], start_node)
-    return paths
+def bitmask_to_modules(bitmask, modules):
+    """
+    Convert an integer bitmask over an indexed collection of modules back to a list of modules.
+
+    :param bitmask: Integer bitmask
+    :param modules: List of Module objects indexing the bits
+    :return: List of the Module objects whose bit is set, in the order of modules
+    """
+    return [module for i, module in enumerate(modules) if bitmask >> i & 1]
+
+def popcount(bitmask):
+    """
+    Count the number of set bits of a bitmask, that is the number of modules it represents.
+
+    :param bitmask: Integer bitmask
+    :return: Number of set bits
+    """
+    return bin(bitmask).count("1")
+
+def bit_positions(bitmask):
+    """
+    Find the positions of the set bits of a bitmask.
+
+    :param bitmask: Integer bitmask
+    :return: List of the positions of the set bits, in increasing order
+    """
+    bits = bin(bitmask)[:1:-1] # Binary digits from the lowest bit
+    positions = []
+    position = bits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = bits.find("1", position + 1)
+    return positions
+
+def transpose_bitmasks(bitmasks, width):
+    """
+    Transpose a list of bitmasks, seen as the rows of a 0/1 matrix.
+
+    :param bitmasks: List of integer bitmasks with at most width bits
+    :param width: Number of columns of the matrix
+    :return: List of width bitmasks, where bit i of the j-th bitmask is bit j of bitmasks[i]
+    """
+    if not bitmasks or width == 0:
+        return [0] * width
+    # Binary digits of every row from the lowest bit, so that zip reads off the columns
+    rows = [format(bitmask, f"0{width}b")[::-1] for bitmask in bitmasks]
+    return [int("".join(column)[::-1], 2) for column in zip(*rows)]
 
 def string_from_modules(module_list):
     """
@@ -114,4 +205,24 @@ def format_path(path):
     for source, label, target in path:
         path_segments.extend([f"---{label}--->", target])
         
-    return " ".join(path_segments)
\ No newline at end of file
+    return " ".join(path_segments)
+
+def parse_pair_input(input_str, n=None, l=None):
+    """
+    Parse a pair (M,P) given on one line as 'M: ...; P: ...', where both parts are in one of the formats of parse_module_input. A part which is left out has no indecomposable modules.
+
+    :param input_str: User input string
+    :param n: Number of vertices in the quiver
+    :param l: Path length bound
+    :return: tuple (M, P) of lists of Module objects
+    """
+    parts = {'M': '', 'P': ''}
+    for part in input_str.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        name, separator, modules_str = part.partition(':')
+        if not separator or name.strip() not in parts:
+            raise ValueError(f"Invalid pair format: {input_str}")
+        parts[name.strip()] = modules_str.strip()
+    return parse_module_input(parts['M'], n, l), parse_module_input(parts['P'], n, l)
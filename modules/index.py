@@ -0,0 +1,57 @@
+import sys
+import time
+from modules.functions import index_torsion_classes, matching_torsion_classes_indexed, minimal_torsion_class_indexed
+from modules.helpers import bit_positions
+
+class TorsionClassIndex:
+    def __init__(self, torsion_class_bitmasks, width):
+        """
+        Index a list of d-torsion classes by the modules of C they contain. The id of a torsion class is its position in the list. The torsion classes are ranked by size and then by id, and every module of C is mapped to the bitmap over the ranks of the torsion classes containing it, stored as a Python integer. Queries are answered by AND and AND NOT of a few bitmaps, and the set bits of the answer list the torsion classes by increasing size. The index is built and queried with index_torsion_classes and the functions using its output.
+
+        :param torsion_class_bitmasks: List of bitmasks of d-torsion classes over the indexed C.
+        :param width: The number of modules in C.
+        """
+        start = time.perf_counter()
+        self.torsion_classes = torsion_class_bitmasks
+        self.order, self.classes_containing = index_torsion_classes(torsion_class_bitmasks, width)
+        self.build_time = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.order)
+
+    def memory_size(self):
+        """Number of bytes used by the bitmaps and the ranking of the index"""
+        return (sum(sys.getsizeof(bitmap) for bitmap in self.classes_containing)
+                + sys.getsizeof(self.order) + sum(sys.getsizeof(i) for i in self.order))
+
+    def matching(self, contained=0, excluded=0):
+        """
+        Find the d-torsion classes containing a collection of modules and none of another collection.
+
+        :param contained: Bitmask of the modules which the torsion classes contain.
+        :param excluded: Bitmask of the modules which the torsion classes do not contain.
+        :return: Bitmap over the ranks of the matching torsion classes.
+        """
+        return matching_torsion_classes_indexed(self.order, self.classes_containing, contained, excluded)
+
+    def ids(self, ranks):
+        """Convert a bitmap over the ranks to the list of ids of the torsion classes, by increasing size"""
+        return [self.order[rank] for rank in bit_positions(ranks)]
+
+    def containing(self, bitmask):
+        """Find the ids of the torsion classes containing a collection of modules, by increasing size"""
+        return self.ids(self.matching(contained=bitmask))
+
+    def excluding(self, bitmask):
+        """Find the ids of the torsion classes containing none of a collection of modules, by increasing size"""
+        return self.ids(self.matching(excluded=bitmask))
+
+    def minimal(self, contained=0, excluded=0):
+        """
+        Find the minimal d-torsion class containing a collection of modules and none of another collection.
+
+        :param contained: Bitmask of the modules which the torsion class contains.
+        :param excluded: Bitmask of the modules which the torsion class does not contain.
+        :return: The id of the first minimal torsion class, or None if no torsion class matches.
+        """
+        return minimal_torsion_class_indexed(contained, self.order, self.classes_containing, excluded)
@@ -0,0 +1,163 @@
+from collections import Counter
+from modules.helpers import popcount
+
+class TorsionClassLattice:
+    def __init__(self, torsion_class_index):
+        """
+        Compute the Hasse diagram of the d-torsion classes of a TorsionClassIndex, ordered by inclusion. The torsion classes containing a torsion class U are found by intersecting the bitmaps of the modules of U. The upper covers of U are then found in order of size: the smallest torsion class strictly containing U is a cover, and every torsion class containing it is removed from the candidates, until no candidates are left. This takes one bitmap operation for every module of every torsion class and for every cover.
+
+        :param torsion_class_index: TorsionClassIndex of the d-torsion classes.
+        """
+        self.index = torsion_class_index
+        order = torsion_class_index.order
+        self.rank = [0] * len(order)
+        for rank, i in enumerate(order):
+            self.rank[i] = rank
+
+        # Bitmaps over the ranks of the torsion classes containing every torsion class, itself included, by rank
+        self.above = [torsion_class_index.matching(contained=torsion_class_index.torsion_classes[i]) for i in order]
+
+        # Covers between the ranks
+        self.upper = []
+        self.lower = [[] for _ in order]
+        for rank in range(len(order)):
+            covers = []
+            candidates = self.above[rank] & ~(1 << rank)
+            while candidates:
+                cover = (candidates & -candidates).bit_length() - 1
+                covers.append(cover)
+                self.lower[cover].append(rank)
+                candidates &= ~self.above[cover]
+            self.upper.append(covers)
+
+    def __len__(self):
+        return len(self.rank)
+
+    def _ids(self, ranks):
+        return [self.index.order[rank] for rank in ranks]
+
+    def upper_covers(self, i):
+        """The ids of the torsion classes covering torsion class i, by increasing size"""
+        return self._ids(self.upper[self.rank[i]])
+
+    def lower_covers(self, i):
+        """The ids of the torsion classes covered by torsion class i, by increasing size"""
+        return self._ids(self.lower[self.rank[i]])
+
+    def covers(self):
+        """The list of all cover relations as tuples (i, j) of ids, where torsion class j covers torsion class i"""
+        return [(self.index.order[rank], self.index.order[cover]) for rank, covers in enumerate(self.upper) for cover in covers]
+
+    def is_contained(self, i, j):
+        """Check if torsion class i is contained in torsion class j"""
+        return bool(self.above[self.rank[i]] >> self.rank[j] & 1)
+
+    def _below(self, rank):
+        # Bitmap over the ranks of the torsion classes contained in the torsion class of a rank, itself included
+        index = self.index
+        all_modules = (1 << len(index.classes_containing)) - 1
+        return index.matching(excluded=all_modules & ~index.torsion_classes[index.order[rank]])
+
+    def join(self, i, j):
+        """
+        Find the smallest torsion class containing torsion classes i and j.
+
+        :return: The id of the join, or None if the torsion classes containing both have no smallest element.
+        """
+        upper_bounds = self.above[self.rank[i]] & self.above[self.rank[j]]
+        if not upper_bounds:
+            return None
+        # The smallest upper bound by size is the join if any upper bound is
+        least = (upper_bounds & -upper_bounds).bit_length() - 1
+        if upper_bounds & ~self.above[least]:
+            return None
+        return self.index.order[least]
+
+    def meet(self, i, j):
+        """
+        Find the largest torsion class contained in torsion classes i and j.
+
+        :return: The id of the meet, or None if the torsion classes contained in both have no largest element.
+        """
+        lower_bounds = self._below(self.rank[i]) & self._below(self.rank[j])
+        if not lower_bounds:
+            return None
+        # The largest lower bound by size is the meet if any lower bound is
+        greatest = lower_bounds.bit_length() - 1
+        if lower_bounds & ~self._below(greatest):
+            return None
+        return self.index.order[greatest]
+
+    def height(self):
+        """The number of covers in a longest chain of torsion classes"""
+        longest = [0] * len(self.rank)
+        # Covers go from smaller to larger ranks, so the ranks are in topological order
+        for rank, covers in enumerate(self.upper):
+            for cover in covers:
+                longest[cover] = max(longest[cover], longest[rank] + 1)
+        return max(longest, default=0)
+
+    def count_maximal_chains(self):
+        """The number of maximal chains of torsion classes, which are the paths in the Hasse diagram from a minimal to a maximal torsion class"""
+        chains = [1 if not self.lower[rank] else 0 for rank in range(len(self.rank))]
+        for rank, covers in enumerate(self.upper):
+            for cover in covers:
+                chains[cover] += chains[rank]
+        return sum(chains[rank] for rank, covers in enumerate(self.upper) if not covers)
+
+    def iter_maximal_chains(self):
+        """
+        Iterate over the maximal chains of torsion classes.
+
+        :return: A generator of lists of ids, from a minimal to a maximal torsion class.
+        """
+        for start in range(len(self.rank)):
+            if self.lower[start]:
+                continue
+            if not self.upper[start]:
+                yield self._ids([start])
+                continue
+            # One iterator over the upper covers for every torsion class in the current chain
+            chain = [start]
+            cover_iterators = [iter(self.upper[start])]
+            while cover_iterators:
+                cover = next(cover_iterators[-1], None)
+                if cover is None:
+                    cover_iterators.pop()
+                    chain.pop()
+                elif not self.upper[cover]:
+                    yield self._ids(chain + [cover])
+                else:
+                    chain.append(cover)
+                    cover_iterators.append(iter(self.upper[cover]))
+
+    def degree_distributions(self):
+        """
+        Count the torsion classes by their numbers of lower and upper covers.
+
+        :return: A tuple (in_degrees, out_degrees) of dictionaries from the numbers of lower covers, respectively upper covers, to the number of torsion classes with that many, sorted by number.
+        """
+        in_degrees = Counter(len(covers) for covers in self.lower)
+        out_degrees = Counter(len(covers) for covers in self.upper)
+        return dict(sorted(in_degrees.items())), dict(sorted(out_degrees.items()))
+
+    def statistics(self):
+        """Summary statistics of the Hasse diagram as a dictionary"""
+        in_degrees, out_degrees = self.degree_distributions()
+        return {
+            'torsion classes': len(self.rank),
+            'covers': sum(len(covers) for covers in self.upper),
+            'height': self.height(),
+            'maximal chains': self.count_maximal_chains(),
+            'in-degrees': in_degrees,
+            'out-degrees': out_degrees,
+        }
+
+    def to_networkx(self):
+        """The Hasse diagram as a NetworkX DiGraph on the ids, with an edge from every torsion class to each of its upper covers and the size of every torsion class as node attribute"""
+        import networkx as nx
+        H = nx.DiGraph()
+        for i, bitmask in enumerate(self.index.torsion_classes):
+            H.add_node(i, size=popcount(bitmask))
+        H.add_edges_from(self.covers())
+        return H
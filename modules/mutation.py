@@ -0,0 +1,76 @@
+from modules.helpers import bit_positions
+
+def pair_to_summands(M, P, width):
+    """
+    Combine the two parts of a tau_d-rigid pair (M, P) into one bitmask of summands, where bit i is the module C_i as a summand of M and bit width + i is the module C_i as a summand of P.
+
+    :param M: Bitmask of the modules in M.
+    :param P: Bitmask of the modules in P.
+    :param width: The number of modules in C.
+    :return: The bitmask of summands.
+    """
+    return M | P << width
+
+def mutation_edges(pairs, width):
+    """
+    Find all pairs of tau_d-rigid pairs which differ in exactly one summand. Every tau_d-rigid pair is entered in a dictionary under each of the bitmasks obtained by removing one of its summands, so that two summand maximal pairs differ in exactly one summand if and only if they share such a key. This takes time linear in the number of pairs times n, plus the number of edges.
+
+    :param pairs: List of tuples (M, P) of bitmasks of summand maximal tau_d-rigid pairs.
+    :param width: The number of modules in C.
+    :return: A list of tuples (i, j, summand_i, summand_j) with i < j, where pairs i and j differ in exactly one summand, and summand_i and summand_j are the positions of the summands in which they differ, as in pair_to_summands.
+    """
+    pairs_without_summand = {}
+    for i, (M, P) in enumerate(pairs):
+        summands = pair_to_summands(M, P, width)
+        for summand in bit_positions(summands):
+            pairs_without_summand.setdefault(summands & ~(1 << summand), []).append((i, summand))
+
+    edges = []
+    for neighbours in pairs_without_summand.values():
+        for k, (i, summand_i) in enumerate(neighbours):
+            for j, summand_j in neighbours[k + 1:]:
+                edges.append((i, j, summand_i, summand_j))
+    edges.sort()
+    return edges
+
+def summand_to_string(summand, modules):
+    """
+    Convert the position of a summand, as in pair_to_summands, to a readable string.
+
+    :param summand: The position of the summand.
+    :param modules: List of the modules in C.
+    :return: String in format 'M(a,b) in M' or 'M(a,b) in P'.
+    """
+    module = modules[summand % len(modules)]
+    return f"M({module.a},{module.b}) in {'P' if summand >= len(modules) else 'M'}"
+
+def mutation_graph_to_networkx(pairs, edges, modules):
+    """
+    Build the mutation graph of summand maximal tau_d-rigid pairs as a NetworkX graph.
+
+    :param pairs: List of tuples (M, P) of bitmasks of summand maximal tau_d-rigid pairs.
+    :param edges: The output of mutation_edges for the pairs.
+    :param modules: List of the modules in C.
+    :return: A NetworkX Graph on the positions of the pairs, with the pairs as node attributes 'M' and 'P' and the exchanged summands as edge attributes 'summand_i' and 'summand_j'.
+    """
+    import networkx as nx
+    H = nx.Graph()
+    for i, (M, P) in enumerate(pairs):
+        H.add_node(i,
+                   M=" ⊕ ".join(f"M({modules[k].a},{modules[k].b})" for k in bit_positions(M)) or "0",
+                   P=" ⊕ ".join(f"M({modules[k].a},{modules[k].b})" for k in bit_positions(P)) or "0")
+    for i, j, summand_i, summand_j in edges:
+        H.add_edge(i, j, summand_i=summand_to_string(summand_i, modules), summand_j=summand_to_string(summand_j, modules))
+    return H
+
+def write_mutation_graph(filename, pairs, edges, modules):
+    """
+    Write the mutation graph of summand maximal tau_d-rigid pairs to a GraphML file, see mutation_graph_to_networkx.
+
+    :param filename: The file to write.
+    :param pairs: List of tuples (M, P) of bitmasks of summand maximal tau_d-rigid pairs.
+    :param edges: The output of mutation_edges for the pairs.
+    :param modules: List of the modules in C.
+    """
+    import networkx as nx
+    nx.write_graphml(mutation_graph_to_networkx(pairs, edges, modules), filename)
@@ -0,0 +1,120 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from modules.functions import iter_d_torsion_class_bitmasks
+from modules.helpers import iter_paths_of_given_length_in_a_multigraph
+
+# State of a worker process, set once by _initialize_worker
+_worker_state = None
+
+# Number of d-torsion classes whose tau_d-rigid pairs are computed together
+PAIR_BATCH_SIZE = 4096
+
+def path_prefixes(G, odd_nodes, prefix_length):
+    """
+    Find all prefixes of a given length of the paths in G starting at an odd node, in the order of the depth first search.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param prefix_length: The length of the prefixes.
+    :return: A list of tuples (start_node, prefix), where prefix is a list of (source, edge_label, target) tuples.
+    """
+    return [(node, prefix) for node in odd_nodes
+            for prefix in iter_paths_of_given_length_in_a_multigraph(G, node, prefix_length)]
+
+def choose_prefix_length(G, odd_nodes, p, shards):
+    """
+    Find the shortest prefix length giving at least a given number of shards, so that the shards are small enough to balance the work between the processes.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param p: The number of diagonals.
+    :param shards: The desired number of shards.
+    :return: An integer between 0 and p-1.
+    """
+    prefix_length = 0
+    while prefix_length < p - 1 and len(path_prefixes(G, odd_nodes, prefix_length)) < shards:
+        prefix_length += 1
+    return prefix_length
+
+def _initialize_worker(G, node_blocks, edge_blocks, tables):
+    global _worker_state
+    _worker_state = (G, node_blocks, edge_blocks, tables)
+
+def _with_pairs(records, tables, compute_pairs):
+    """
+    Add the summand maximal tau_d-rigid pairs to records as they are enumerated, computing them for PAIR_BATCH_SIZE d-torsion classes at a time.
+
+    :param records: Iterable of tuples (edge_ids, torsion_class) as given by iter_d_torsion_class_bitmasks.
+    :param tables: HomologicalTables of C.
+    :param compute_pairs: Whether to compute the pairs, which are None otherwise.
+    :return: A generator of tuples (edge_ids, torsion_class, M_U, P_U).
+    """
+    if not compute_pairs:
+        for edge_ids, tc in records:
+            yield edge_ids, tc, None, None
+        return
+    records = iter(records)
+    while True:
+        batch = list(islice(records, PAIR_BATCH_SIZE))
+        if not batch:
+            return
+        pairs = tables.tau_d_rigid_pairs([tc for edge_ids, tc in batch])
+        for (edge_ids, tc), (M_U, P_U) in zip(batch, pairs):
+            yield edge_ids, tc, M_U, P_U
+
+def _enumerate_shard(shard):
+    """
+    Enumerate the d-torsion classes extending a prefix in a worker process.
+
+    :param shard: A tuple (start_node, prefix, compute_pairs).
+    :return: A list of compact records (edge_ids, torsion_class, M_U, P_U), where edge_ids is the tuple of ids of the edges of the path in G, the other entries are bitmasks over C and M_U, P_U are None unless compute_pairs is True.
+    """
+    G, node_blocks, edge_blocks, tables = _worker_state
+    start_node, prefix, compute_pairs = shard
+    return list(_with_pairs(iter_d_torsion_class_bitmasks(G, start_node, node_blocks, edge_blocks, prefix), tables, compute_pairs))
+
+def iter_torsion_classes_parallel(G, odd_nodes, node_blocks, edge_blocks, tables, processes=None, compute_pairs=False, prefix_length=None):
+    """
+    Enumerate the d-torsion classes with a pool of processes. The search tree of the paths in G is split into shards by the start node and the first edges of the path, every worker enumerates the classes of a shard and sends them back as compact records, and the results are put together in the order of the shards. Only a bounded number of shards are submitted at a time, so that finished shards do not pile up in memory while the output is consumed. With one process the records are streamed from the enumeration, without holding a shard in memory. The pairs are computed in batches of PAIR_BATCH_SIZE d-torsion classes. The output is in the same order as the serial enumeration.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param node_blocks: Bitmasks of the nodes in every diagonal, as in the output of torsion_class_blocks.
+    :param edge_blocks: Bitmasks of the edges between consecutive diagonals, as in the output of torsion_class_blocks.
+    :param tables: HomologicalTables of C, used if compute_pairs is True.
+    :param processes: Number of worker processes, by default the number of CPUs. With one process no pool is started.
+    :param compute_pairs: Whether the workers also compute the summand maximal tau_d-rigid pairs (M^U, P^U).
+    :param prefix_length: Length of the prefixes defining the shards, by default chosen to give several shards per process.
+    :return: A generator of tuples (torsion_class, path, M_U, P_U), where torsion_class, M_U and P_U are bitmasks over C, M_U and P_U are None unless compute_pairs is True and path is a list of (source, edge_label, target) tuples.
+    """
+    processes = processes or os.cpu_count() or 1
+    edges = G.edge_tuples
+    if processes == 1:
+        for node in odd_nodes:
+            records = iter_d_torsion_class_bitmasks(G, node, node_blocks, edge_blocks)
+            yield from _expand_records(_with_pairs(records, tables, compute_pairs), edges)
+        return
+
+    if prefix_length is None:
+        prefix_length = choose_prefix_length(G, odd_nodes, len(node_blocks), 4 * processes)
+    shards = [(node, prefix, compute_pairs) for node, prefix in path_prefixes(G, odd_nodes, prefix_length)]
+
+    initargs = (G, node_blocks, edge_blocks, tables)
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initialize_worker, initargs=initargs) as executor:
+        # Two shards per process are in flight, and the next shard is submitted before the records of a finished one are given out
+        shards = iter(shards)
+        pending = deque(executor.submit(_enumerate_shard, shard) for shard in islice(shards, 2 * processes))
+        try:
+            while pending:
+                records = pending.popleft().result()
+                pending.extend(executor.submit(_enumerate_shard, shard) for shard in islice(shards, 1))
+                yield from _expand_records(records, edges)
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _expand_records(records, edges):
+    for edge_ids, tc, M_U, P_U in records:
+        yield tc, [edges[i] for i in edge_ids], M_U, P_U
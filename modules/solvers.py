@@ -0,0 +1,150 @@
+from modules.functions import modules_from_node_template, modules_from_edge_template
+from modules.helpers import modules_to_bitmask, popcount
+
+def torsion_class_blocks(G, odd_nodes, even_nodes, simples, l, module_index):
+    """
+    Compute the blocks of modules which the nodes and edges of the graph G contribute to a d-torsion class, in every diagonal where they can appear, as bitmasks over the indexed d-cluster tilting subcategory.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param even_nodes: List of nodes which can appear in an even diagonal.
+    :param simples: List of simple modules.
+    :param l: The l in the algebra.
+    :param module_index: Dictionary from modules in C to their position in the indexed C.
+    :return: A tuple (node_blocks, edge_blocks), where node_blocks[i] is a dictionary from the nodes to the bitmask of their modules in diagonal i+1, and edge_blocks[i] is a dictionary from the ids of the edges to the bitmask of their modules between diagonals i+1 and i+2.
+    """
+    node_blocks = []
+    edge_blocks = []
+    for i in range(len(simples)):
+        nodes = odd_nodes if i % 2 == 0 else even_nodes
+        node_blocks.append({node: modules_to_bitmask(
+            modules_from_node_template(G.node_templates[G.node_ids[node]], simples[i].a), module_index) for node in nodes})
+        if i == len(simples) - 1:
+            continue
+        edge_blocks.append({edge: modules_to_bitmask(
+            modules_from_edge_template(G.edge_templates[edge], simples[i].a, simples[i + 1].a, l), module_index)
+            for node in nodes for edge in G.out_edges[G.node_ids[node]]})
+    return node_blocks, edge_blocks
+
+def union_of_blocks(blocks):
+    """
+    Compute the bitmask of all modules which can appear in a given diagonal or between two given diagonals.
+
+    :param blocks: Dictionary from nodes or edges to bitmasks, as in the output of torsion_class_blocks.
+    :return: The union of the bitmasks.
+    """
+    union = 0
+    for bitmask in blocks.values():
+        union |= bitmask
+    return union
+
+def minimal_torsion_class_path(bitmask, G, odd_nodes, node_blocks, edge_blocks):
+    """
+    Find the minimal d-torsion class containing a given collection of modules without enumerating the d-torsion classes. Every module of C lies in exactly one diagonal or between two consecutive diagonals, so a path contains the collection if and only if every node and edge of the path contains the part of the collection in its diagonal. The minimal size of such a path from every node in every diagonal is computed backwards from the last diagonal, which takes time linear in the size of G times p.
+
+    :param bitmask: Bitmask of a collection of modules inside the d-cluster tilting subcategory.
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param node_blocks: Bitmasks of the nodes in every diagonal, as in the output of torsion_class_blocks.
+    :param edge_blocks: Bitmasks of the edges between consecutive diagonals, as in the output of torsion_class_blocks.
+    :return: A tuple (torsion_class_bitmask, path) for the minimal d-torsion class containing the collection, or None if no such class exists. Among classes of the same size, the first one in the order of enumeration is returned.
+    """
+    node_requirements = [bitmask & union_of_blocks(blocks) for blocks in node_blocks]
+    edge_requirements = [bitmask & union_of_blocks(blocks) for blocks in edge_blocks]
+
+    # Minimal size of the modules from a node in diagonal i+1 until the end, and the first edge realising it
+    p = len(node_blocks)
+    sizes = [dict() for _ in range(p)]
+    choices = [dict() for _ in range(p)]
+    for node, block in node_blocks[p - 1].items():
+        if block & node_requirements[p - 1] == node_requirements[p - 1]:
+            sizes[p - 1][node] = popcount(block)
+    for i in range(p - 2, -1, -1):
+        for node, block in node_blocks[i].items():
+            if block & node_requirements[i] != node_requirements[i]:
+                continue
+            for edge in G.out_edges[G.node_ids[node]]:
+                edge_block = edge_blocks[i][edge]
+                v = G.node_names[G.edge_targets[edge]]
+                if edge_block & edge_requirements[i] != edge_requirements[i] or v not in sizes[i + 1]:
+                    continue
+                size = popcount(block) + popcount(edge_block) + sizes[i + 1][v]
+                if node not in sizes[i] or size < sizes[i][node]:
+                    sizes[i][node] = size
+                    choices[i][node] = edge
+
+    start_node = None
+    for node in odd_nodes:
+        if node in sizes[0] and (start_node is None or sizes[0][node] < sizes[0][start_node]):
+            start_node = node
+    if start_node is None:
+        return None
+
+    # Follow the choices to recover the path and its modules
+    path = []
+    torsion_class_bitmask = node_blocks[0][start_node]
+    node = start_node
+    for i in range(p - 1):
+        edge = choices[i][node]
+        path.append(G.edge_tuples[edge])
+        node = path[-1][2]
+        torsion_class_bitmask |= edge_blocks[i][edge] | node_blocks[i + 1][node]
+    return torsion_class_bitmask, path
+
+def torsion_class_path(bitmask, G, odd_nodes, node_blocks, edge_blocks):
+    """
+    Find the path in the graph G corresponding to a collection of modules, which is the inverse of from_path_to_d_torsion_class. The collection is split according to the diagonals, and the part in every diagonal and between every two consecutive diagonals has to be exactly the block of a node or an edge. This takes time linear in p times the size of G.
+
+    :param bitmask: Bitmask of a collection of modules inside the d-cluster tilting subcategory.
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param node_blocks: Bitmasks of the nodes in every diagonal, as in the output of torsion_class_blocks.
+    :param edge_blocks: Bitmasks of the edges between consecutive diagonals, as in the output of torsion_class_blocks.
+    :return: The path as a list of (source, edge_label, target) tuples if the collection is a d-torsion class, or None otherwise.
+    """
+    node_parts = [bitmask & union_of_blocks(blocks) for blocks in node_blocks]
+    edge_parts = [bitmask & union_of_blocks(blocks) for blocks in edge_blocks]
+
+    # The edge reaching every node in diagonal i+1 which is compatible with the collection up to diagonal i+1
+    p = len(node_blocks)
+    reached = [{node: None for node in odd_nodes if node_blocks[0][node] == node_parts[0]}]
+    for i in range(p - 1):
+        reached.append({})
+        for node in reached[i]:
+            for edge in G.out_edges[G.node_ids[node]]:
+                v = G.node_names[G.edge_targets[edge]]
+                if edge_blocks[i][edge] == edge_parts[i] and node_blocks[i + 1][v] == node_parts[i + 1] and v not in reached[i + 1]:
+                    reached[i + 1][v] = edge
+    if not reached[p - 1]:
+        return None
+
+    # Follow the edges backwards to recover the path
+    path = []
+    node = next(iter(reached[p - 1]))
+    for i in range(p - 1, 0, -1):
+        path.append(G.edge_tuples[reached[i][node]])
+        node = path[-1][0]
+    path.reverse()
+    return path
+
+def ext_d_projective_weights(G, odd_nodes, node_blocks, edge_blocks, tables):
+    """
+    Compute the number of Ext^d-projective modules which the nodes and edges of the graph G contribute to a d-torsion class U. Ext^d from a module of U is only nonzero to modules of U in the previous diagonal or between the previous diagonal and its own, so the Ext^d-projective modules of an edge and its target node only depend on the blocks of the edge, its source and its target.
+
+    :param G: The graph.
+    :param odd_nodes: List of nodes which can appear in an odd diagonal.
+    :param node_blocks: Bitmasks of the nodes in every diagonal, as in the output of torsion_class_blocks.
+    :param edge_blocks: Bitmasks of the edges between consecutive diagonals, as in the output of torsion_class_blocks.
+    :param tables: HomologicalTables of C.
+    :return: A tuple (node_weights, edge_weights) as used by path_weight_distribution, giving the numbers of modules in M^U.
+    """
+    node_weights = {node: popcount(tables.ext_d_projective_modules(node_blocks[0][node])) for node in odd_nodes}
+    edge_weights = []
+    for i, blocks in enumerate(edge_blocks):
+        edge_weights.append({})
+        for edge, edge_block in blocks.items():
+            u, label, v = G.edge_tuples[edge]
+            new_modules = edge_block | node_blocks[i + 1][v]
+            edge_weights[i][edge] = popcount(
+                tables.ext_d_projective_modules(node_blocks[i][u] | new_modules) & new_modules)
+    return node_weights, edge_weights
@@ -0,0 +1,126 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+# Header of a store file: magic, d, l, p, number of torsion classes, path length, bytes per edge id, bytes per bitmask
+HEADER = struct.Struct("<4sIIIQIII")
+MAGIC = b"DTS1"
+
+def edge_id_typecode(number_of_edges):
+    """The typecode of the array module used for the edge ids of a graph with a given number of edges"""
+    return "H" if number_of_edges <= 1 << 16 else "I"
+
+def write_store(path, records, d, l, p, number_of_edges, width):
+    """
+    Write d-torsion classes to a store file of fixed-width records, streaming them from an iterator so that they are never all held in memory. Every record consists of the edge ids of the path of a torsion class followed by its bitmask. The file is written under a temporary name and then renamed, so that it is never read half written.
+
+    :param path: The file to write.
+    :param records: Iterable of tuples (edge_ids, bitmask), where edge_ids are the ids in G of the p-1 edges of the path and bitmask is the bitmask of the torsion class over the indexed C.
+    :param d: The d in the d-cluster tilting.
+    :param l: The l in the algebra.
+    :param p: The number of diagonals.
+    :param number_of_edges: The number of edges of G.
+    :param width: The number of modules in C.
+    :return: The number of records written.
+    """
+    typecode = edge_id_typecode(number_of_edges)
+    edge_id_size = array(typecode).itemsize
+    width_bytes = (width + 7) // 8
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(HEADER.pack(MAGIC, d, l, p, 0, p - 1, edge_id_size, width_bytes))
+            for edge_ids, bitmask in records:
+                edge_ids = array(typecode, edge_ids)
+                if len(edge_ids) != p - 1:
+                    raise ValueError(f"Path of length {len(edge_ids)} given instead of {p - 1}")
+                if sys.byteorder == "big":
+                    edge_ids.byteswap()
+                f.write(edge_ids.tobytes())
+                f.write(bitmask.to_bytes(width_bytes, "little"))
+                count += 1
+            # Write the number of records now that it is known
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, d, l, p, count, p - 1, edge_id_size, width_bytes))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return count
+
+class TorsionClassStore:
+    def __init__(self, path):
+        """
+        Read a store file written by write_store through a memory map, so that only the records which are used are loaded. Record i is the i-th torsion class written.
+
+        :param path: The file to read.
+        :raises ValueError: If the file is not a valid store file.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"Store file {path} is truncated")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.d, self.l, self.p, self.count, self.path_length, edge_id_size, self.width_bytes = HEADER.unpack_from(self._map)
+        self.typecode = "H" if edge_id_size == 2 else "I"
+        self.edge_ids_size = self.path_length * edge_id_size
+        self.record_size = self.edge_ids_size + self.width_bytes
+        if magic != MAGIC or array(self.typecode).itemsize != edge_id_size or size != HEADER.size + self.count * self.record_size:
+            self._map.close()
+            raise ValueError(f"Store file {path} is not valid")
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def _offset(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(f"Torsion class {i} is not in the store")
+        return HEADER.size + i * self.record_size
+
+    def edge_ids(self, i):
+        """The ids in G of the edges of the path of torsion class i"""
+        offset = self._offset(i)
+        edge_ids = array(self.typecode)
+        edge_ids.frombytes(self._map[offset:offset + self.edge_ids_size])
+        if sys.byteorder == "big":
+            edge_ids.byteswap()
+        return edge_ids
+
+    def bitmask(self, i):
+        """The bitmask of torsion class i over the indexed C"""
+        offset = self._offset(i) + self.edge_ids_size
+        return int.from_bytes(self._map[offset:offset + self.width_bytes], "little")
+
+    def __getitem__(self, i):
+        return self.edge_ids(i), self.bitmask(i)
+
+    def bitmasks(self):
+        """Iterate over the bitmasks of all torsion classes, reading only the bitmask part of every record"""
+        for offset in range(HEADER.size + self.edge_ids_size, len(self._map), self.record_size):
+            yield int.from_bytes(self._map[offset:offset + self.width_bytes], "little")
+
+    def scan(self, contained=0, excluded=0):
+        """
+        Find the torsion classes containing a collection of modules and none of another collection by a scan of the bitmasks.
+
+        :param contained: Bitmask of the modules which the torsion classes contain.
+        :param excluded: Bitmask of the modules which the torsion classes do not contain.
+        :return: A generator of the positions of the matching torsion classes.
+        """
+        for i, bitmask in enumerate(self.bitmasks()):
+            if bitmask & contained == contained and not bitmask & excluded:
+                yield i
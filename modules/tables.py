@@ -0,0 +1,161 @@
+from bisect import bisect_left, bisect_right
+from modules.functions import tau_d, is_projective, is_injective
+from modules.helpers import bit_positions, transpose_bitmasks
+
+class HomologicalTables:
+    def __init__(self, cluster_tilting, simples, d, l, n):
+        """
+        Precompute the homological data of the d-cluster tilting subcategory C once, so that the predicates of modules.functions become table lookups. Collections of modules are given as bitmasks over cluster_tilting.
+
+        :param cluster_tilting: List of the modules in C, sorted by coordinates.
+        :param simples: List of simple modules.
+        :param d: The d in the d-cluster tilting.
+        :param l: The l in the algebra.
+        :param n: The n in the algebra.
+        """
+        self.modules = cluster_tilting
+        self.index = {module: i for i, module in enumerate(cluster_tilting)}
+
+        # Diagonal of every module, or None for the projective-injective modules lying between two diagonals
+        diagonal_of_coordinate = {}
+        for i, simple in enumerate(simples):
+            diagonal_of_coordinate.setdefault(simple.a, i + 1)
+        self.diagonal = []
+        for module in cluster_tilting:
+            diagonals = [diagonal_of_coordinate[x] for x in module if x in diagonal_of_coordinate]
+            self.diagonal.append(min(diagonals) if diagonals else None)
+
+        # Position of tau_d of every module, or None if it is the zero module
+        self.tau_d = []
+        for module in cluster_tilting:
+            tau_d_module = tau_d(module, d, l)
+            self.tau_d.append(None if tau_d_module is None else self.index[tau_d_module])
+
+        self.projective = 0
+        self.injective = 0
+        for i, module in enumerate(cluster_tilting):
+            if is_projective(module, l):
+                self.projective |= 1 << i
+            if is_injective(module, n, l):
+                self.injective |= 1 << i
+
+        # Bit j of ext_d[i] is set if and only if Ext^d(C_i, C_j) is nonzero, which is only possible if C_i lies in the diagonal after C_j
+        modules_in_diagonal = [[] for _ in range(len(simples) + 1)]
+        for j, diagonal in enumerate(self.diagonal):
+            if diagonal is not None:
+                modules_in_diagonal[diagonal].append(j)
+        self.ext_d = [0] * len(cluster_tilting)
+        for i, module_a in enumerate(cluster_tilting):
+            if self.projective >> i & 1 or self.diagonal[i] is None or self.diagonal[i] == 1:
+                continue
+            tau_d_module_a = cluster_tilting[self.tau_d[i]]
+            for j in modules_in_diagonal[self.diagonal[i] - 1]:
+                if self.injective >> j & 1:
+                    continue
+                module_b = cluster_tilting[j]
+                if self.diagonal[i] % 2 == 1:
+                    nonzero = tau_d_module_a.a >= module_b.a
+                else:
+                    nonzero = tau_d_module_a.b >= module_b.b
+                if nonzero:
+                    self.ext_d[i] |= 1 << j
+
+        # Bit j of hom[i] is set if and only if Hom(C_i, C_j) is nonzero, that is a <= c <= b <= d for C_i = (a,b) and C_j = (c,d)
+        # Bit i of hom_to[j] is set if and only if Hom(C_i, C_j) is nonzero
+        first_coordinates = [module.a for module in cluster_tilting]
+        self.hom = [0] * len(cluster_tilting)
+        self.hom_to = [0] * len(cluster_tilting)
+        for i, module_a in enumerate(cluster_tilting):
+            for j in range(bisect_left(first_coordinates, module_a.a), bisect_right(first_coordinates, module_a.b)):
+                if module_a.b <= cluster_tilting[j].b:
+                    self.hom[i] |= 1 << j
+                    self.hom_to[j] |= 1 << i
+
+    def ext_d_is_zero(self, i, j):
+        """Check if Ext^d(C_i, C_j) = 0"""
+        return not self.ext_d[i] >> j & 1
+
+    def hom_is_zero(self, i, j):
+        """Check if Hom(C_i, C_j) = 0"""
+        return not self.hom[i] >> j & 1
+
+    def ext_d_projective_modules(self, U):
+        """
+        Find all Ext^d-projective modules in the subcategory U of C.
+
+        :param U: Bitmask of a collection of modules in C.
+        :return: Bitmask of all Ext^d-projective modules in U.
+        """
+        M_U = 0
+        for i in bit_positions(U):
+            if self.ext_d[i] & U == 0:
+                M_U |= 1 << i
+        return M_U
+
+    def modules_with_hom_to(self, M):
+        """
+        Find all modules in C with nonzero Hom to a collection of modules.
+
+        :param M: Bitmask of a collection of modules in C.
+        :return: Bitmask of all modules X in C with Hom(X, M) nonzero.
+        """
+        result = 0
+        for j in bit_positions(M):
+            result |= self.hom_to[j]
+        return result
+
+    def maximal_projective(self, M):
+        """
+        Find the maximal collection of projective modules which have no Hom to M.
+
+        :param M: Bitmask of a collection of modules in C.
+        :return: Bitmask of all projective modules with no Hom to M.
+        """
+        return self.projective & ~self.modules_with_hom_to(M)
+
+    def is_tau_d_rigid_pair(self, M, P):
+        """
+        Check if (M, P) is a tau_d-rigid pair, that is Hom(M, tau_d(M)) = 0, P is projective and Hom(P, M) = 0.
+
+        :param M: Bitmask of a collection of modules in C.
+        :param P: Bitmask of a collection of modules in C.
+        :return: True if (M, P) is a tau_d-rigid pair, False otherwise.
+        """
+        tau_d_M = 0
+        for i in bit_positions(M):
+            if self.tau_d[i] is not None:
+                tau_d_M |= 1 << self.tau_d[i]
+        return (self.modules_with_hom_to(tau_d_M) & M == 0 and P & ~self.projective == 0
+                and self.modules_with_hom_to(M) & P == 0)
+
+    def tau_d_rigid_pairs(self, torsion_classes):
+        """
+        Compute the summand maximal tau_d-rigid pairs (M^U, P^U) of many d-torsion classes U in one pass. The classes are transposed into one bitmask over the classes for every module of C, so that every Ext^d and Hom row of C is used once for all classes together.
+
+        :param torsion_classes: List of bitmasks of d-torsion classes.
+        :return: List of tuples (M_U, P_U) of bitmasks, in the same order as torsion_classes.
+        """
+        all_classes = (1 << len(torsion_classes)) - 1
+        classes_containing = transpose_bitmasks(torsion_classes, len(self.modules))
+
+        # Module C_i is in M^U if it is in U and no module in U has Ext^d from C_i
+        classes_with_M = []
+        for i, row in enumerate(self.ext_d):
+            classes_with_ext_d = 0
+            for j in bit_positions(row):
+                classes_with_ext_d |= classes_containing[j]
+            classes_with_M.append(classes_containing[i] & ~classes_with_ext_d)
+
+        # Projective module C_i is in P^U if no module in M^U has Hom from C_i
+        classes_with_P = []
+        for i, row in enumerate(self.hom):
+            if not self.projective >> i & 1:
+                classes_with_P.append(0)
+                continue
+            classes_with_hom = 0
+            for j in bit_positions(row):
+                classes_with_hom |= classes_with_M[j]
+            classes_with_P.append(all_classes & ~classes_with_hom)
+
+        return list(zip(transpose_bitmasks(classes_with_M, len(torsion_classes)),
+                        transpose_bitmasks(classes_with_P, len(torsion_classes))))
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from main import HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator
+from modules.functions import is_tau_d_rigid_pair, from_path_to_d_torsion_class_by_blocks
+from modules.helpers import parse_module_input
+
+# Largest number of d-torsion classes in one page of the enumerate method
+MAX_PAGE_SIZE = 10000
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Methods which enumerate d-torsion classes and are answered by the pool of processes. The others are answered in the server process.
+POOL_METHODS = {"enumerate"}
+
+def default_socket_path():
+    """The Unix socket the server listens on by default"""
+    return os.path.join(tempfile.gettempdir(), "d_torsion_classes.sock")
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a Unix socket left behind by a server which is no longer running, so that a new server can listen on it.
+
+    :param socket_path: The path of the socket.
+    :raises ValueError: If the path exists and is not a socket, or if a server is listening on it.
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            # Nobody listens on the socket any more
+            os.remove(socket_path)
+            return
+        except FileNotFoundError:
+            return
+    raise ValueError(f"Another server is listening on {socket_path}")
+
+class CalculatorCache:
+    def __init__(self, max_calculators=8, cache_directory=None):
+        """
+        The calculators of the algebras (d,l,p) used last, which answer the queries about them.
+
+        :param max_calculators: Number of calculators kept.
+        :param cache_directory: Directory of the cache files of the calculators.
+        """
+        self.max_calculators = max_calculators
+        self.cache_directory = cache_directory
+        # Calculators by (d, l, p), least recently used first
+        self.calculators = OrderedDict()
+
+    def get(self, d, l, p):
+        """Get the calculator of the algebra (d,l,p), computing it if it is not among the most recently used ones"""
+        key = (d, l, p)
+        if key in self.calculators:
+            self.calculators.move_to_end(key)
+            return self.calculators[key]
+        calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator(self.cache_directory)
+        calc.set_initial_data(d, l, p)
+        self.calculators[key] = calc
+        while len(self.calculators) > self.max_calculators:
+            self.calculators.popitem(last=False)
+        return calc
+
+    def answer(self, method, params):
+        """
+        Answer a query with the calculator of its algebra.
+
+        :param method: One of the names in METHODS.
+        :param params: Dictionary with the integers d, l, p and the parameters of the method.
+        :return: The result, which can be encoded as JSON.
+        :raises ValueError: If the parameters are not valid.
+        """
+        try:
+            d, l, p = (params[key] for key in ("d", "l", "p"))
+        except KeyError as e:
+            raise ValueError(f"Missing parameter {e}")
+        if not all(isinstance(value, int) for value in (d, l, p)):
+            raise ValueError("d, l and p must be integers")
+        return METHODS[method](self.get(d, l, p), params)
+
+# Calculators of a worker process, set by _initialize_worker
+_calculators = CalculatorCache()
+
+def _initialize_worker(max_calculators, cache_directory):
+    global _calculators
+    _calculators = CalculatorCache(max_calculators, cache_directory)
+
+def _module_names(modules):
+    return [f"M({module.a},{module.b})" for module in modules]
+
+def _path_fields(calc, path):
+    """The edge names and edge ids of a path in G, as in the export of the d-torsion classes"""
+    edge_ids = calc.path_to_edge_ids(path)
+    return {"path": [calc.G.edge_names[edge] for edge in edge_ids], "edge_ids": edge_ids}
+
+def _parse_pair(calc, params):
+    M = parse_module_input(params.get("M", ""), calc.n, calc.l)
+    P = parse_module_input(params.get("P", ""), calc.n, calc.l)
+    M_basic, P_basic, is_basic = calc._get_basic_pair(M, P)
+    is_valid, message = is_tau_d_rigid_pair(M_basic, P_basic, calc.l, calc.d)
+    return M_basic, P_basic, is_valid, message
+
+def query_count(calc, params):
+    return {"count": calc.count_torsion_classes()}
+
+def query_enumerate(calc, params):
+    limit = params.get("limit", 100)
+    if not 0 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 0 and {MAX_PAGE_SIZE}")
+    offset = params.get("offset", 0)
+    torsion_classes, next_offset = calc.get_torsion_class_page(offset, limit)
+    return {"total": calc.count_torsion_classes(), "next_offset": next_offset,
+            "torsion_classes": [{"id": rank, **_path_fields(calc, path), "modules": _module_names(tc)}
+                                for rank, (tc, path) in enumerate(torsion_classes, offset)]}
+
+def query_pairs(calc, params):
+    path = calc.find_torsion_class_path(parse_module_input(params.get("modules", ""), calc.n, calc.l))
+    if path is None:
+        raise ValueError(f"This is not a valid {calc.d}-torsion class")
+    M_U, P_U = calc.compute_tau_d_rigid_pair(from_path_to_d_torsion_class_by_blocks(path, calc.node_lists, calc.edge_lists))
+    return {"M_U": _module_names(M_U), "P_U": _module_names(P_U)}
+
+def query_minimal(calc, params):
+    M_basic, P_basic, is_valid, message = _parse_pair(calc, params)
+    if not is_valid:
+        return {"rigid": False, "message": message, "torsion_class": None}
+    minimal = calc.find_minimal_torsion_class(M_basic)
+    if minimal is None:
+        return {"rigid": True, "message": message, "torsion_class": None}
+    min_tc, min_path = minimal
+    return {"rigid": True, "message": message,
+            "torsion_class": {**_path_fields(calc, min_path), "modules": _module_names(min_tc)}}
+
+def query_check_rigid(calc, params):
+    M_basic, P_basic, is_valid, message = _parse_pair(calc, params)
+    summands = len(set(M_basic).union(set(P_basic)))
+    return {"rigid": is_valid, "message": message, "summands": summands, "summand_maximal": is_valid and summands == calc.n}
+
+# Methods of the server, each answering the params of a request with the calculator of the algebra (d,l,p) given in them
+METHODS = {
+    "count": query_count,
+    "enumerate": query_enumerate,
+    "pairs": query_pairs,
+    "minimal": query_minimal,
+    "check_rigid": query_check_rigid,
+}
+
+def answer_query(method, params):
+    """Answer a query with the calculators of a worker process, see CalculatorCache.answer"""
+    return _calculators.answer(method, params)
+
+def _error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+class QueryServer:
+    def __init__(self, processes=None, max_calculators=8, cache_directory=None):
+        """
+        Server answering queries about the algebras (d,l,p) in JSON-RPC 2.0, one request or response per line, over a Unix socket or TCP. Every request is answered in its own task, and responses are sent as soon as they are ready. The server process keeps the calculators of the algebras it used last and answers the queries which do not enumerate d-torsion classes with them, one after another in a thread, so that they stay warm between requests. The methods in POOL_METHODS are answered by a pool of processes, so that long enumerations run concurrently and do not block the other requests, where every worker process keeps its own calculators. If a cache directory is given, the enumerated d-torsion classes are shared by all processes through the cache files.
+
+        :param processes: Number of worker processes, by default the number of CPUs.
+        :param max_calculators: Number of calculators kept by the server process and by every worker process.
+        :param cache_directory: Directory of the cache files, by default the one given by the environment variable D_TORSION_CACHE_DIR. If neither is given every process only caches in memory.
+        """
+        self.calculators = CalculatorCache(max_calculators, cache_directory)
+        # A single thread, so that the calculators of the server process are never used concurrently
+        self.thread = ThreadPoolExecutor(max_workers=1)
+        self.executor = ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1,
+                                            initializer=_initialize_worker, initargs=(max_calculators, cache_directory))
+        self.server = None
+        self.socket_path = None
+        # Writers of the open connections by the tasks handling them
+        self.connections = {}
+
+    async def start(self, socket_path=None, host="127.0.0.1", port=None):
+        """
+        Start listening on a TCP port if one is given, and on a Unix socket otherwise, and return the asyncio server. A socket left behind by a server which is no longer running is replaced.
+
+        :raises ValueError: If the Unix socket is used by a running server or its path is not a socket.
+        """
+        if port is not None:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        else:
+            socket_path = socket_path or default_socket_path()
+            remove_stale_socket(socket_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+            # Only the socket of this server is removed by close
+            self.socket_path = socket_path
+        return self.server
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=None):
+        """Start the server and answer requests until it is closed"""
+        server = await self.start(socket_path, host, port)
+        print(f"Listening on {f'{host}:{port}' if port is not None else self.socket_path}", file=sys.stderr)
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, server.close)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are not available on Windows or outside the main thread
+                pass
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
+            self.close()
+
+    async def stop(self):
+        """Stop listening and close the open connections"""
+        self.server.close()
+        # Closing a connection ends the reading of its requests, and the requests already read are finished without sending their answers
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def close(self):
+        """Remove the Unix socket and shut down the thread and the worker processes, after the server is stopped"""
+        if self.socket_path is not None and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.thread.shutdown()
+        self.executor.shutdown()
+
+    async def handle_request(self, line):
+        """
+        Answer one request line.
+
+        :param line: The request, a JSON-RPC 2.0 request object.
+        :return: The response object, or None for a notification.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error_response(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        if method not in METHODS:
+            response = _error_response(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        elif not isinstance(params, dict):
+            response = _error_response(request_id, INVALID_PARAMS, "params must be an object")
+        else:
+            try:
+                loop = asyncio.get_running_loop()
+                if method in POOL_METHODS:
+                    result = await loop.run_in_executor(self.executor, answer_query, method, params)
+                else:
+                    result = await loop.run_in_executor(self.thread, self.calculators.answer, method, params)
+                response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+            except (ValueError, TypeError) as e:
+                response = _error_response(request_id, INVALID_PARAMS, str(e))
+            except Exception as e:
+                response = _error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        return response if "id" in request else None
+
+    async def handle_connection(self, reader, writer):
+        connection = asyncio.current_task()
+        self.connections[connection] = writer
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            response = await self.handle_request(line)
+            if response is not None:
+                async with lock:
+                    writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(respond(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.pop(connection, None)
+            writer.close()
+
+def request(method, params, socket_path=None, host="127.0.0.1", port=None, timeout=None):
+    """
+    Send one request to a running server and wait for its answer, for scripts and notebooks.
+
+    :param method: One of the names in METHODS.
+    :param params: Dictionary with the integers d, l, p and the parameters of the method.
+    :param socket_path: The Unix socket of the server, by default default_socket_path(), used unless a port is given.
+    :param host: The host of the server, if it listens on a TCP port.
+    :param port: The TCP port of the server.
+    :param timeout: Timeout in seconds, by default none.
+    :return: The result.
+    :raises ValueError: If the server answers with an error.
+    """
+    if port is not None:
+        connection = socket.create_connection((host, port), timeout=timeout)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(socket_path or default_socket_path())
+    with connection, connection.makefile("rwb") as f:
+        f.write(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode("utf-8") + b"\n")
+        f.flush()
+        response = json.loads(f.readline())
+    if "error" in response:
+        raise ValueError(f"{response['error']['message']} (error {response['error']['code']})")
+    return response["result"]
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Local server answering queries about linear Nakayama algebras with homogeneous relations in JSON-RPC 2.0, one request per line. "
+                    f"Methods: {', '.join(METHODS)}. Every request has the integer params d, l and p.")
+    parser.add_argument('--socket', default=None, help=f"Unix socket to listen on (default: {default_socket_path()})")
+    parser.add_argument('--host', default="127.0.0.1", help="host to listen on if a port is given (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=None, help="TCP port to listen on instead of a Unix socket")
+    parser.add_argument('--processes', type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument('--max-calculators', type=int, default=8, help="number of algebras kept in memory by the server and by every worker process (default: 8)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="directory where the enumerated d-torsion classes are cached and shared by the server and the worker processes (default: $D_TORSION_CACHE_DIR, or only in memory)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = QueryServer(args.processes, args.max_calculators, args.cache_dir)
+    try:
+        asyncio.run(server.serve(args.socket, args.host, args.port))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        server.close()
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
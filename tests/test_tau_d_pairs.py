@@ -1,8 +1,30 @@
 from main import HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator
-from modules.functions import ext_d_projective_modules, maximal_projective, minimal_torsion_class, is_tau_d_rigid_pair
+from modules.functions import ( is_tau_d_rigid_pair, ext_d_is_zero, hom_is_zero, tau_d, get_diagonal,
+                               compute_modules_for_node, compute_modules_for_edge, modules_from_node_template, modules_from_edge_template,
+                               iter_d_torsion_classes, iter_d_torsion_class_bitmasks, ext_d_projective_modules, maximal_projective)
 from modules.helpers import string_from_modules, format_path
+from modules.index import TorsionClassIndex
+from modules.lattice import TorsionClassLattice
+from modules.mutation import mutation_edges
+from modules.cache import EnumerationCache, layout_fingerprint
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from io import StringIO
+from itertools import islice
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import cli
+import server
+import os
+import random
+import socket
+import tempfile
+import threading
 
 def validate_tau_d_pair_size(M, P, expected_n):
     """
@@ -21,27 +43,339 @@ def validate_tau_d_pair_size(M, P, expected_n):
         return (False, f"Expected {expected_n} modules, found {total_modules}")
     return (True, "Size requirement satisfied")
 
-def validate_minimal_torsion_class(M_U, U, all_torsion_classes):
+def validate_reference_pair(calc, U, M_U, P_U):
     """
-    Validate that U is the minimal d-torsion class containing M^U.
-    
-    :param M_U: List of modules in M^U
+    Validate that the tau_d-rigid pair computed with the precomputed tables agrees with the reference functions ext_d_projective_modules and maximal_projective, which work directly with the modules.
+
+    :param calc: A calculator whose data has been computed
     :param U: A d-torsion class
-    :param all_torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :param M_U: List of modules in M^U computed with the tables
+    :param P_U: List of modules in P^U computed with the tables
     :return: tuple (bool, str) - (is_valid, error_message)
     """
-    # Convert M_U and U to sets for comparison
-    U_set = set(U)
+    reference_M_U = ext_d_projective_modules(U, calc.simples, calc.d, calc.l, calc.n)
+    if set(reference_M_U) != set(M_U):
+        return (False, f"Reference M^U = {string_from_modules(reference_M_U)} differs")
+    reference_P_U = maximal_projective(reference_M_U, calc.projectives)
+    if set(reference_P_U) != set(P_U):
+        return (False, f"Reference P^U = {string_from_modules(reference_P_U)} differs")
+    return (True, "Reference requirement satisfied")
+
+def validate_minimal_torsion_class(M_U, U, all_torsion_classes, torsion_class_index):
+    """
+    Validate that U is the minimal d-torsion class containing M^U.
     
+    :param M_U: Bitmask of the modules in M^U
+    :param U: Bitmask of a d-torsion class
+    :param all_torsion_classes: List of bitmasks of all d-torsion classes
+    :param torsion_class_index: TorsionClassIndex of all_torsion_classes
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
     # Find minimal torsion class containing M_U
-    min_tc = minimal_torsion_class(M_U, all_torsion_classes)
+    min_position = torsion_class_index.minimal(M_U)
     
-    if min_tc is None:
+    if min_position is None:
         return (False, "Could not find a torsion class containing M^U")
-    if set(min_tc) != U_set:
+    if all_torsion_classes[min_position] != U:
         return (False, f"Minimal torsion class containing M^U differs from U")
     return (True, "Minimal torsion class requirement satisfied")
 
+def validate_minimal_torsion_classes(calc, torsion_class_bitmasks, tau_d_rigid_pairs):
+    """
+    Validate with the index of all d-torsion classes that every d-torsion class U is the minimal d-torsion class containing M^U. This needs all d-torsion classes, so it is done once for the algebra and not for each chunk of d-torsion classes.
+
+    :param calc: A calculator whose tables have been computed
+    :param torsion_class_bitmasks: List of bitmasks of all d-torsion classes
+    :param tau_d_rigid_pairs: List of their tau_d-rigid pairs (M^U, P^U)
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    torsion_class_index = TorsionClassIndex(torsion_class_bitmasks, len(calc.module_index))
+    for i, (U, (M_U, P_U)) in enumerate(zip(torsion_class_bitmasks, tau_d_rigid_pairs), 1):
+        min_tc_valid, min_tc_message = validate_minimal_torsion_class(
+            calc.to_bitmask(M_U), U, torsion_class_bitmasks, torsion_class_index)
+        if not min_tc_valid:
+            return (False, f"Torsion class {i} with M^U = {string_from_modules(M_U)}: {min_tc_message}")
+    return (True, f"M^U generates U for all {len(torsion_class_bitmasks)} d-torsion classes")
+
+def validate_minimal_torsion_class_solver(calc, M_U, U):
+    """
+    Validate that the minimal d-torsion class containing M^U found without enumeration is U.
+
+    :param calc: A calculator whose blocks have been computed
+    :param M_U: List of modules in M^U
+    :param U: A d-torsion class
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    minimal = calc.find_minimal_torsion_class(M_U)
+
+    if minimal is None:
+        return (False, "Solver could not find a torsion class containing M^U")
+    if set(minimal[0]) != set(U):
+        return (False, f"Minimal torsion class containing M^U found by the solver differs from U")
+    return (True, "Minimal torsion class requirement satisfied")
+
+def validate_torsion_class_path(calc, U, path):
+    """
+    Validate that the path in G(C) recovered from the modules of U is the path U was computed from.
+
+    :param calc: A calculator whose blocks have been computed
+    :param U: A d-torsion class
+    :param path: The path in G(C) corresponding to U
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    recovered_path = calc.find_torsion_class_path(U)
+
+    if recovered_path is None:
+        return (False, "Could not recover a path from U")
+    if recovered_path != path:
+        return (False, f"Recovered path {format_path(recovered_path)} differs from the path of U")
+    return (True, "Path requirement satisfied")
+
+def validate_torsion_class_index(calc, torsion_class_bitmasks):
+    """
+    Validate the containment and exclusion queries of the index of the d-torsion classes for every single module of C.
+
+    :param calc: A calculator whose tables have been computed
+    :param torsion_class_bitmasks: List of bitmasks of all d-torsion classes
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    torsion_class_index = TorsionClassIndex(torsion_class_bitmasks, len(calc.module_index))
+    sizes = [bin(tc).count("1") for tc in torsion_class_bitmasks]
+    for i, module in enumerate(calc.cluster_tilting):
+        containing = torsion_class_index.containing(1 << i)
+        excluding = torsion_class_index.excluding(1 << i)
+        if sorted(containing) != [j for j, tc in enumerate(torsion_class_bitmasks) if tc >> i & 1]:
+            return (False, f"Torsion classes containing M({module.a},{module.b}) are wrong")
+        if sorted(excluding) != [j for j, tc in enumerate(torsion_class_bitmasks) if not tc >> i & 1]:
+            return (False, f"Torsion classes not containing M({module.a},{module.b}) are wrong")
+        if [sizes[j] for j in containing] != sorted(sizes[j] for j in containing):
+            return (False, f"Torsion classes containing M({module.a},{module.b}) are not ordered by size")
+    return (True, "Index requirement satisfied")
+
+def validate_cache(calc, torsion_classes):
+    """
+    Validate that the d-torsion classes stored in the cache and read back from the cache file are the enumerated ones.
+
+    :param calc: A calculator whose data has been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    cache = calc.cache
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            calc.cache = EnumerationCache(directory)
+            if calc.get_all_torsion_classes() != torsion_classes:
+                return (False, "Torsion classes stored in the cache differ from the enumerated ones")
+            # A new cache has to read the cache file
+            calc.cache = EnumerationCache(directory)
+            if calc.get_all_torsion_classes() != torsion_classes:
+                return (False, "Torsion classes read from the cache file differ from the enumerated ones")
+            if (calc.d, calc.l, calc.p) not in calc.cache.entries:
+                return (False, "Torsion classes were not read from the cache file")
+            # A cache file written for another order of the modules is not used
+            if EnumerationCache(directory).get(calc.d, calc.l, calc.p, layout_fingerprint(calc.cluster_tilting[::-1], calc.G.edge_names)) is not None:
+                return (False, "Cache file was read for another order of the modules")
+    finally:
+        calc.cache = cache
+    return (True, "Cache requirement satisfied")
+
+def validate_store(calc, torsion_classes):
+    """
+    Validate that the d-torsion classes exported to a store file and read back through a memory map are the enumerated ones.
+
+    :param calc: A calculator whose data has been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "torsion_classes.bin")
+        if calc.export_torsion_classes(filename) != len(torsion_classes):
+            return (False, "Number of exported torsion classes is wrong")
+        with calc.open_torsion_class_store(filename) as store:
+            if len(store) != len(torsion_classes):
+                return (False, "Number of torsion classes in the store is wrong")
+            bitmasks = [calc.to_bitmask(tc) for tc, path in torsion_classes]
+            for i, (tc, path) in enumerate(torsion_classes):
+                edge_ids, bitmask = store[i]
+                if calc.path_from_edge_ids(edge_ids) != path or bitmask != bitmasks[i]:
+                    return (False, f"Torsion class {i + 1} in the store differs from the enumerated one")
+            # Classes containing the first module of C but not the last one
+            last = len(calc.cluster_tilting) - 1
+            if list(store.scan(1, 1 << last)) != [i for i, tc in enumerate(bitmasks) if tc & 1 and not tc >> last & 1]:
+                return (False, "Scan of the store is wrong")
+    return (True, "Store requirement satisfied")
+
+def validate_export(calc, torsion_classes, tau_d_rigid_pairs):
+    """
+    Validate that the d-torsion classes and tau_d-rigid pairs exported to NDJSON and to compressed CSV files are the enumerated ones.
+
+    :param calc: A calculator whose data has been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :param tau_d_rigid_pairs: List of the tau_d-rigid pairs (M_U, P_U) of the d-torsion classes
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    def to_names(modules):
+        return [f"M({module.a},{module.b})" for module in sorted(modules, key=calc.module_index.get)]
+
+    expected = [{"id": i, "path": [calc.G.edge_names[edge] for edge in calc.path_to_edge_ids(path)],
+                 "edge_ids": calc.path_to_edge_ids(path), "size": len(tc), "modules": to_names(tc),
+                 "M_U": to_names(M_U), "P_U": to_names(P_U)}
+                for i, ((tc, path), (M_U, P_U)) in enumerate(zip(torsion_classes, tau_d_rigid_pairs))]
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "torsion_classes.ndjson")
+        if calc.export_torsion_class_table(filename, include_pairs=True) != len(torsion_classes):
+            return (False, "Number of torsion classes exported to NDJSON is wrong")
+        with open(filename, encoding="utf-8") as f:
+            if [json.loads(line) for line in f] != expected:
+                return (False, "Torsion classes exported to NDJSON differ from the enumerated ones")
+
+        filename = os.path.join(directory, "torsion_classes.csv.gz")
+        if calc.export_torsion_class_table(filename) != len(torsion_classes):
+            return (False, "Number of torsion classes exported to CSV is wrong")
+        with gzip.open(filename, "rt", encoding="utf-8", newline="") as f:
+            rows = [{"id": int(row["id"]), "path": row["path"].split(";"),
+                     "edge_ids": [int(edge) for edge in row["edge_ids"].split(";")], "size": int(row["size"]),
+                     "modules": row["modules"].split(";") if row["modules"] else []}
+                    for row in csv.DictReader(f)]
+        if rows != [{key: record[key] for key in ("id", "path", "edge_ids", "size", "modules")} for record in expected]:
+            return (False, "Torsion classes exported to CSV differ from the enumerated ones")
+    return (True, "Export requirement satisfied")
+
+def validate_ranks(calc, torsion_classes):
+    """
+    Validate that the d-torsion class in every position of the enumeration is found from its position without enumeration, and the other way around.
+
+    :param calc: A calculator whose path counts have been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    for i, torsion_class in enumerate(torsion_classes):
+        if calc.get_torsion_class(i) != torsion_class:
+            return (False, f"Torsion class found from position {i} differs from the enumerated one")
+        if calc.rank_torsion_class(torsion_class[1]) != i:
+            return (False, f"Position found from the path of torsion class {i + 1} is wrong")
+    try:
+        calc.get_torsion_class(len(torsion_classes))
+        return (False, "A torsion class was found after the last one")
+    except ValueError:
+        pass
+    return (True, "Rank requirement satisfied")
+
+def validate_pages(calc, torsion_classes, page_size=7):
+    """
+    Validate that the pages of the d-torsion classes, found without enumerating the ones before them, cover the enumeration in order, and that the enumeration can be resumed from every position.
+
+    :param calc: A calculator whose path counts have been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :param page_size: The number of d-torsion classes in every page
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    pages = []
+    offset = 0
+    while offset is not None:
+        page, offset = calc.get_torsion_class_page(offset, page_size)
+        pages += page
+    if pages != torsion_classes:
+        return (False, "Pages of the torsion classes differ from the enumeration")
+    # Resume the enumeration from a spread of positions, including the last one
+    for offset in range(len(torsion_classes) - 1, -1, -max(1, len(torsion_classes) // 10)):
+        if list(calc.iter_torsion_classes_from(offset)) != torsion_classes[offset:]:
+            return (False, f"Enumeration resumed from position {offset} differs from the enumerated one")
+    if calc.get_torsion_class_page(len(torsion_classes), page_size) != ([], None):
+        return (False, "A page was found after the last torsion class")
+    return (True, "Page requirement satisfied")
+
+def validate_size_distributions(calc, torsion_classes, tau_d_rigid_pairs):
+    """
+    Validate that the numbers of d-torsion classes U of every size |U| and |M^U| computed without enumeration agree with the enumeration.
+
+    :param calc: A calculator whose data has been computed
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :param tau_d_rigid_pairs: List of the tau_d-rigid pairs (M^U, P^U) of all d-torsion classes
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    if calc.size_distribution() != dict(sorted(Counter(len(tc) for tc, path in torsion_classes).items())):
+        return (False, "Numbers of torsion classes U by the size of U are wrong")
+    if calc.ext_d_projective_distribution() != dict(sorted(Counter(len(M_U) for M_U, P_U in tau_d_rigid_pairs).items())):
+        return (False, "Numbers of torsion classes U by the size of M^U are wrong")
+    return (True, "Size distribution requirement satisfied")
+
+def validate_lattice(calc, torsion_class_bitmasks, max_size=500):
+    """
+    Validate the cover relations of the d-torsion classes against a comparison of all pairs of d-torsion classes, and the joins and meets of some pairs against all common upper and lower bounds. This is only done for at most max_size d-torsion classes.
+
+    :param calc: A calculator whose tables have been computed
+    :param torsion_class_bitmasks: List of bitmasks of all d-torsion classes
+    :param max_size: The largest number of d-torsion classes for which the validation is done
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    if len(torsion_class_bitmasks) > max_size:
+        return (True, "Too many torsion classes to validate the lattice")
+    lattice = TorsionClassLattice(TorsionClassIndex(torsion_class_bitmasks, len(calc.module_index)))
+    contained = [[tc & ~other == 0 for other in torsion_class_bitmasks] for tc in torsion_class_bitmasks]
+    classes = range(len(torsion_class_bitmasks))
+    for i in classes:
+        above = [j for j in classes if contained[i][j] and j != i]
+        covers = [j for j in above if not any(contained[k][j] and k != j for k in above)]
+        if sorted(lattice.upper_covers(i)) != covers:
+            return (False, f"Upper covers of torsion class {i + 1} are wrong")
+        # Joins and meets with one other torsion class for every torsion class
+        for j in [(7 * i + 3) % len(torsion_class_bitmasks)]:
+            upper_bounds = [k for k in classes if contained[i][k] and contained[j][k]]
+            joins = [k for k in upper_bounds if all(contained[k][m] for m in upper_bounds)]
+            lower_bounds = [k for k in classes if contained[k][i] and contained[k][j]]
+            meets = [k for k in lower_bounds if all(contained[m][k] for m in lower_bounds)]
+            if lattice.join(i, j) != (joins[0] if joins else None) or lattice.meet(i, j) != (meets[0] if meets else None):
+                return (False, f"Join or meet of torsion classes {i + 1} and {j + 1} is wrong")
+    # The maximal chains are only enumerated if there are few of them
+    chain_count = lattice.count_maximal_chains()
+    if chain_count <= 10000 and sum(1 for chain in lattice.iter_maximal_chains()) != chain_count:
+        return (False, "Number of maximal chains is wrong")
+    return (True, "Lattice requirement satisfied")
+
+def validate_mutation_graph(calc, tau_d_rigid_pairs, max_size=500):
+    """
+    Validate the mutation graph of the summand maximal tau_d-rigid pairs against a comparison of all pairs of them, which is only done for at most max_size pairs. For more pairs it is only checked that every edge joins pairs differing in exactly one summand.
+
+    :param calc: A calculator whose data has been computed
+    :param tau_d_rigid_pairs: List of the tau_d-rigid pairs (M^U, P^U) of all d-torsion classes
+    :param max_size: The largest number of pairs which are all compared
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    width = len(calc.cluster_tilting)
+    pairs = [(calc.to_bitmask(M_U), calc.to_bitmask(P_U)) for M_U, P_U in tau_d_rigid_pairs]
+    summands = [M | P << width for M, P in pairs]
+    edges = mutation_edges(pairs, width)
+    for i, j, summand_i, summand_j in edges:
+        if summands[i] ^ summands[j] != (1 << summand_i) | (1 << summand_j):
+            return (False, f"Pairs {i + 1} and {j + 1} do not differ in exactly the given summands")
+    if len(pairs) <= max_size:
+        expected = [(i, j) for i in range(len(pairs)) for j in range(i + 1, len(pairs))
+                    if bin(summands[i] ^ summands[j]).count("1") == 2 and bin(summands[i] & ~summands[j]).count("1") == 1]
+        if [(i, j) for i, j, summand_i, summand_j in edges] != expected:
+            return (False, "Edges of the mutation graph are wrong")
+    return (True, "Mutation graph requirement satisfied")
+
+def validate_parallel_enumeration(calc, torsion_class_bitmasks, torsion_classes, tau_d_rigid_pairs):
+    """
+    Validate that the enumeration with a pool of processes gives the same d-torsion classes, paths and tau_d-rigid pairs in the same order as the serial enumeration.
+
+    :param calc: A calculator whose tables and graph have been computed
+    :param torsion_class_bitmasks: List of bitmasks of all d-torsion classes
+    :param torsion_classes: List of all d-torsion classes as tuples (torsion_class, path)
+    :param tau_d_rigid_pairs: List of the tau_d-rigid pairs (M^U, P^U) of all d-torsion classes
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    parallel = list(calc.iter_torsion_classes_parallel(processes=2, compute_pairs=True))
+    if len(parallel) != len(torsion_classes):
+        return (False, f"Parallel enumeration found {len(parallel)} torsion classes instead of {len(torsion_classes)}")
+    for i, (tc, path, M_U, P_U) in enumerate(parallel):
+        if tc != torsion_class_bitmasks[i] or path != torsion_classes[i][1]:
+            return (False, f"Torsion class {i + 1} differs in the parallel enumeration")
+        if M_U != calc.to_bitmask(tau_d_rigid_pairs[i][0]) or P_U != calc.to_bitmask(tau_d_rigid_pairs[i][1]):
+            return (False, f"tau_d-rigid pair of torsion class {i + 1} differs in the parallel enumeration")
+    return (True, "Parallel enumeration requirement satisfied")
+
 def validate_torsion_class_count(d, l, p, n, actual_count):
     """
     Validate if the number of d-torsion classes matches the conjectured formula.
@@ -70,18 +404,101 @@ def validate_torsion_class_count(d, l, p, n, actual_count):
     else:
         return (False, f"Conjectured {expected_count} {d}-torsion classes but found {actual_count}. Difference: {actual_count - expected_count}")
 
-def test_algebra(d, l, p, write_output):
+def validate_counted_torsion_classes(counted, actual_count):
     """
-    Given an algebra with parameters (d,l,p), two tests are performed.
+    Validate that the number of d-torsion classes obtained from the transfer matrices of G(C) agrees with the enumeration.
 
-    First it is tested whether the number of d-torsion classes agrees with the formula of Remark 4.23 from https://arxiv.org/pdf/2410.19505.
-     
-    Second for each d-torsion class U it is tested whether the summand maximal tau_d-rigid pair (M^U, P^U) obtained by taking M^U to be the Ext^d-projective generator of U is computed correctly. This is done by checking three conditions: that the pair (M^U, P^U) has the correct number of indecomposable summands, that the minimal d-torsion class containing M^U is U, and that (M^U, P^U) is a tau_d-rigid pair.
+    :param counted: Number of d-torsion classes computed without enumeration
+    :param actual_count: Actual number of d-torsion classes found
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    if counted != actual_count:
+        return (False, f"Counted {counted} torsion classes but enumerated {actual_count}")
+    return (True, "Count requirement satisfied")
+
+def validate_templates(calc):
+    """
+    Validate that the templates attached to the nodes and edges of G(C) give the same modules as the name based computation, in every diagonal where the node or edge can appear.
+
+    :param calc: A calculator whose graph has been built
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    for position in range(1, calc.p + 1):
+        nodes = calc.odd_nodes if position % 2 == 1 else calc.even_nodes
+        base = calc.simples[position - 1].a
+        for node in nodes:
+            expected = compute_modules_for_node(node, position, calc.simples, calc.l)
+            node_id = calc.G.node_ids[node]
+            if modules_from_node_template(calc.G.node_templates[node_id], base) != expected:
+                return (False, f"Template of node {node} is wrong in diagonal {position}")
+            if position == calc.p:
+                continue
+            for edge in calc.G.out_edges[node_id]:
+                name = calc.G.edge_names[edge]
+                expected = compute_modules_for_edge(name, position, calc.simples, calc.l, calc.d)
+                found = modules_from_edge_template(calc.G.edge_templates[edge], base, calc.simples[position].a, calc.l)
+                if found != expected:
+                    return (False, f"Template of edge {name} is wrong in diagonal {position}")
+    return (True, "Template requirement satisfied")
+
+def validate_graph(calc):
+    """
+    Validate that the edge ids of G(C) are numbered by source node with consecutive outgoing edges, as in G.edges(keys=True) of the NetworkX graph, and that enumerating the bitmasks of the d-torsion classes along the edge ids gives the same paths and classes as enumerating their modules.
+
+    :param calc: A calculator whose data has been computed
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    G = calc.G
+    next_edge = 0
+    for node, edges in enumerate(G.out_edges):
+        if edges.start != next_edge:
+            return (False, f"Outgoing edges of {G.node_names[node]} are not consecutive")
+        next_edge = edges.stop
+        for edge in edges:
+            if G.edge_tuples[edge] != (G.node_names[node], G.edge_labels[edge], G.node_names[G.edge_targets[edge]]):
+                return (False, f"Edge {edge} of {G.node_names[node]} is wrong")
+    if next_edge != G.number_of_edges():
+        return (False, "Edges are missing from the outgoing edges")
+    if [(u, data['label'], v) for u, v, key, data in G.to_networkx().edges(keys=True, data=True)] != G.edge_tuples:
+        return (False, "Edge ids differ from the order of the NetworkX graph")
+
+    for node in calc.odd_nodes:
+        records = iter_d_torsion_class_bitmasks(G, node, calc.node_blocks, calc.edge_blocks)
+        for (edge_ids, bitmask), (tc, path) in zip(records, iter_d_torsion_classes(G, node, calc.simples, calc.l)):
+            if list(edge_ids) != calc.path_to_edge_ids(path) or bitmask != calc.to_bitmask(tc):
+                return (False, f"Bitmask enumeration differs for path {format_path(path)}")
+    return (True, "Graph requirement satisfied")
+
+def validate_tables(calc):
+    """
+    Validate that the precomputed tables of the calculator agree with the functions computing diagonals, tau_d, Ext^d and Hom.
+
+    :param calc: A calculator whose tables have been computed
+    :return: tuple (bool, str) - (is_valid, error_message)
+    """
+    tables = calc.tables
+    for i, module_a in enumerate(calc.cluster_tilting):
+        if tables.diagonal[i] is not None and tables.diagonal[i] != get_diagonal(module_a, calc.simples):
+            return (False, f"Diagonal of M({module_a.a},{module_a.b}) is wrong")
+        tau_d_module_a = tau_d(module_a, calc.d, calc.l)
+        if (tables.tau_d[i] is None) != (tau_d_module_a is None) or (
+                tau_d_module_a is not None and calc.cluster_tilting[tables.tau_d[i]] != tau_d_module_a):
+            return (False, f"tau_d of M({module_a.a},{module_a.b}) is wrong")
+        for j, module_b in enumerate(calc.cluster_tilting):
+            if tables.ext_d_is_zero(i, j) != ext_d_is_zero(module_a, module_b, calc.simples, calc.d, calc.l, calc.n):
+                return (False, f"Ext^d(M({module_a.a},{module_a.b}), M({module_b.a},{module_b.b})) is wrong")
+            if tables.hom_is_zero(i, j) != hom_is_zero(module_a, module_b):
+                return (False, f"Hom(M({module_a.a},{module_a.b}), M({module_b.a},{module_b.b})) is wrong")
+    return (True, "Table requirement satisfied")
+
+def setup_calculator(d, l, p):
+    """
+    Initialize a calculator with parameters (d,l,p) and compute all its data.
+
+    :return: The calculator
     """
-    write_output(f"\nTesting algebra with d={d}, l={l}, p={p}")
-    
-    # Initialize calculator with given parameters
     calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator()
+    calc.cache = None
     calc.d = d
     calc.l = l
     calc.p = p
@@ -89,48 +506,149 @@ def test_algebra(d, l, p, write_output):
     calc._calculate_simples()
     calc._calculate_projectives()
     calc._calculate_d_cluster_tilting_subcategory()
+    calc._calculate_tables()
     calc._build_graph()
-    
-    # Get all d-torsion classes
+    calc._calculate_path_counts()
+    calc._calculate_blocks()
+    return calc
+
+def prepare_torsion_classes(calc):
+    """
+    Enumerate all d-torsion classes together with their bitmasks and tau_d-rigid pairs.
+
+    :param calc: A calculator whose data has been computed
+    :return: tuple (torsion_classes, torsion_class_bitmasks, tau_d_rigid_pairs)
+    """
     torsion_classes = calc.get_all_torsion_classes()
+    torsion_class_bitmasks = [calc.to_bitmask(tc) for tc, path in torsion_classes]
+    tau_d_rigid_pairs = calc.compute_tau_d_rigid_pairs([tc for tc, path in torsion_classes])
+    return torsion_classes, torsion_class_bitmasks, tau_d_rigid_pairs
+
+def run_validators(validators, write_output):
+    """
+    Run validators one after another until one of them fails.
+
+    :param validators: List of tuples (name, validator), where validator is a function without arguments returning a tuple (bool, str)
+    :param write_output: Function writing a message to the log
+    :return: True if all validators succeed, False otherwise
+    """
+    for name, validator in validators:
+        valid, message = validator()
+        if not valid:
+            write_output(f"\n{name} validation failed: {message}")
+            return False
+    return True
+
+def check_algebra(calc, write_output):
+    """
+    Perform the tests which concern the algebra as a whole: the precomputed data, the number of d-torsion classes and the parallel enumeration.
+
+    :param calc: A calculator whose data has been computed
+    :param write_output: Function writing a message to the log
+    :return: tuple (bool, tuple) - (is_valid, output of prepare_torsion_classes)
+    """
+    # Check the precomputed tables, the templates of G(C) and the edge ids of G(C) with the enumeration of bitmasks along them
+    if not run_validators([
+            ("Table", lambda: validate_tables(calc)),
+            ("Template", lambda: validate_templates(calc)),
+            ("Graph", lambda: validate_graph(calc)),
+    ], write_output):
+        return (False, None)
+
+    # Get all d-torsion classes
+    prepared = prepare_torsion_classes(calc)
+    torsion_classes, torsion_class_bitmasks, tau_d_rigid_pairs = prepared
     actual_count = len(torsion_classes)
-    write_output(f"Found {actual_count} {d}-torsion classes")
+    write_output(f"Found {actual_count} {calc.d}-torsion classes")
 
     # Check conjectured formula
-    formula_valid, formula_message = validate_torsion_class_count(d, l, p, calc.n, actual_count)
+    formula_valid, formula_message = validate_torsion_class_count(calc.d, calc.l, calc.p, calc.n, actual_count)
     if not formula_valid:
         write_output(f"\nFormula validation failed: {formula_message}")
     else:
         write_output(f"\nFormula validation: {formula_message}")
-    
-    # Test each d-torsion class
+
+    # Check everything which is computed from the d-torsion classes
+    if not run_validators([
+            ("Count", lambda: validate_counted_torsion_classes(calc.count_torsion_classes(), actual_count)),
+            ("Index", lambda: validate_torsion_class_index(calc, torsion_class_bitmasks)),
+            ("Minimal torsion class", lambda: validate_minimal_torsion_classes(calc, torsion_class_bitmasks, tau_d_rigid_pairs)),
+            ("Cache", lambda: validate_cache(calc, torsion_classes)),
+            ("Store", lambda: validate_store(calc, torsion_classes)),
+            ("Export", lambda: validate_export(calc, torsion_classes, tau_d_rigid_pairs)),
+            ("Rank", lambda: validate_ranks(calc, torsion_classes)),
+            ("Page", lambda: validate_pages(calc, torsion_classes)),
+            ("Size distribution", lambda: validate_size_distributions(calc, torsion_classes, tau_d_rigid_pairs)),
+            ("Lattice", lambda: validate_lattice(calc, torsion_class_bitmasks)),
+            ("Mutation graph", lambda: validate_mutation_graph(calc, tau_d_rigid_pairs)),
+            ("Parallel enumeration", lambda: validate_parallel_enumeration(
+                calc, torsion_class_bitmasks, torsion_classes, tau_d_rigid_pairs)),
+    ], write_output):
+        return (False, None)
+
+    return (True, prepared)
+
+def check_torsion_classes(calc, torsion_classes, tau_d_rigid_pairs, first=0, show_progress=True):
+    """
+    Test the d-torsion classes with positions first, first+1, ... in the enumeration.
+
+    :param calc: A calculator whose data has been computed
+    :param torsion_classes: List of the d-torsion classes to test as tuples (torsion_class, path)
+    :param tau_d_rigid_pairs: List of their tau_d-rigid pairs (M^U, P^U)
+    :param first: Position of the first d-torsion class to test
+    :param show_progress: Whether to show the progress in the terminal
+    :return: tuple (failed_tests, failed_paths) of lists of failures, numbered from 1 in the enumeration
+    """
+    total = calc.count_torsion_classes()
     failed_tests = []
-    for i, (tc, path) in enumerate(torsion_classes, 1):
+    failed_paths = []
+    for i, (tc, path) in enumerate(torsion_classes, first + 1):
         # Show progress (only to terminal, not to log)
-        print(f"\rChecking {d}-torsion class {i}/{actual_count}", end='')
+        if show_progress:
+            print(f"\rChecking {calc.d}-torsion class {i}/{total}", end='')
+
+        # Recover the path from the modules
+        path_valid, path_message = validate_torsion_class_path(calc, tc, path)
+        if not path_valid:
+            failed_paths.append((i, path_message))
 
         # Compute tau_d-rigid pair
-        M_U = ext_d_projective_modules(tc, calc.simples, calc.d, calc.l, calc.n)
-        P_U = maximal_projective(M_U, calc.projectives)
+        M_U, P_U = tau_d_rigid_pairs[i - first - 1]
         
         # Validate size
         size_valid, size_message = validate_tau_d_pair_size(M_U, P_U, calc.n)
         
+        # Validate against the reference functions
+        reference_valid, reference_message = validate_reference_pair(calc, tc, M_U, P_U)
+
         # Validate minimal torsion class
-        min_tc_valid, min_tc_message = validate_minimal_torsion_class(M_U, tc, torsion_classes)
+        min_tc_valid, min_tc_message = validate_minimal_torsion_class_solver(calc, M_U, tc)
         
         # Validate tau_d-rigid pair
         rigid_valid, rigid_message = is_tau_d_rigid_pair(M_U, P_U, calc.l, calc.d)
+        if rigid_valid != calc.tables.is_tau_d_rigid_pair(calc.to_bitmask(M_U), calc.to_bitmask(P_U)):
+            rigid_valid, rigid_message = (False, "Rigidity from the precomputed tables differs")
         
-        if not size_valid or not min_tc_valid or not rigid_valid:
-            failed_tests.append((i, tc, path, M_U, P_U, size_message, min_tc_message, rigid_message))
+        if not size_valid or not reference_valid or not min_tc_valid or not rigid_valid:
+            failed_tests.append((i, tc, path, M_U, P_U, size_message, reference_message, min_tc_message, rigid_message))
     
-    print()
+    if show_progress:
+        print()
+    return failed_tests, failed_paths
 
-    # Report results
+def report_failures(failed_tests, failed_paths, write_output):
+    """
+    Write the failures of the tests of the d-torsion classes to the log.
+
+    :return: True if there are no failures, False otherwise
+    """
+    if failed_paths:
+        write_output("\nFailed path recovery:")
+        for test_num, path_msg in failed_paths:
+            write_output(f"Torsion class {test_num}: {path_msg}")
     if failed_tests:
         write_output("\nFailed tests:")
-        for test_num, tc, path, M_U, P_U, size_msg, min_tc_msg, rigid_msg in failed_tests:
+        for test_num, tc, path, M_U, P_U, size_msg, reference_msg, min_tc_msg, rigid_msg in failed_tests:
             write_output(f"\nTorsion class {test_num}:")
             write_output(f"U = {string_from_modules(tc)}")
             write_output(f"Path: {format_path(path)}")
@@ -138,17 +656,322 @@ def test_algebra(d, l, p, write_output):
             write_output(f"P^U = {string_from_modules(P_U)}")
             if not size_msg.startswith("Size requirement satisfied"):
                 write_output(f"Size Error: {size_msg}")
+            if not reference_msg.startswith("Reference requirement satisfied"):
+                write_output(f"Reference Pair Error: {reference_msg}")
             if not min_tc_msg.startswith("Minimal torsion class requirement satisfied"):
                 write_output(f"Minimal TC Error: {min_tc_msg}")
             if not rigid_msg.startswith("Valid"):
                 write_output(f"Rigid Pair Error: {rigid_msg}")
         return False
     else:
-        write_output("\nAll tau_d-rigid pairs satisfy all three conditions!")
-        return True
+        write_output("\nAll tau_d-rigid pairs satisfy all four conditions!")
+        return not failed_paths
 
-def run_tests():
-    """Run tests for several parameter combinations and save output to log file"""
+def test_algebra(d, l, p, write_output, show_progress=True):
+    """
+    Given an algebra with parameters (d,l,p), two tests are performed.
+
+    First it is tested whether the number of d-torsion classes agrees with the formula of Remark 4.23 from https://arxiv.org/pdf/2410.19505.
+     
+    Second for each d-torsion class U it is tested whether the summand maximal tau_d-rigid pair (M^U, P^U) obtained by taking M^U to be the Ext^d-projective generator of U is computed correctly. This is done by checking four conditions: that the pair (M^U, P^U) has the correct number of indecomposable summands, that it agrees with the pair computed by ext_d_projective_modules and maximal_projective, that the minimal d-torsion class containing M^U is U, and that (M^U, P^U) is a tau_d-rigid pair.
+    """
+    write_output(f"\nTesting algebra with d={d}, l={l}, p={p}")
+    
+    # Initialize calculator with given parameters
+    calc = setup_calculator(d, l, p)
+
+    algebra_valid, prepared = check_algebra(calc, write_output)
+    if not algebra_valid:
+        return False
+
+    # Test each d-torsion class
+    torsion_classes, torsion_class_bitmasks, tau_d_rigid_pairs = prepared
+    failed_tests, failed_paths = check_torsion_classes(
+        calc, torsion_classes, tau_d_rigid_pairs, 0, show_progress)
+
+    # Report results
+    return report_failures(failed_tests, failed_paths, write_output)
+
+def _run_test_case(case):
+    """Run test_algebra in a worker process and return the result together with the log"""
+    d, l, p = case
+    string_buffer = StringIO()
+    passed = test_algebra(d, l, p, lambda message: print(message, file=string_buffer), show_progress=False)
+    return passed, string_buffer.getvalue()
+
+def _run_test_case_header(case):
+    """Perform the tests of check_algebra in a worker process and return the result together with the log"""
+    d, l, p = case
+    string_buffer = StringIO()
+    write_output = lambda message: print(message, file=string_buffer)
+    write_output(f"\nTesting algebra with d={d}, l={l}, p={p}")
+    algebra_valid, prepared = check_algebra(setup_calculator(d, l, p), write_output)
+    return algebra_valid, string_buffer.getvalue()
+
+def _run_test_case_chunk(case, first, last):
+    """Test a chunk of the d-torsion classes of a case in a worker process and return the failures. Only the d-torsion classes of the chunk are enumerated, since the checks which need all d-torsion classes are done once by check_algebra in _run_test_case_header"""
+    calc = setup_calculator(*case)
+    torsion_classes = list(islice(calc.iter_torsion_classes_from(first), last - first))
+    tau_d_rigid_pairs = calc.compute_tau_d_rigid_pairs([tc for tc, path in torsion_classes])
+    return check_torsion_classes(calc, torsion_classes, tau_d_rigid_pairs, first, show_progress=False)
+
+def run_test_cases_parallel(test_cases, processes, chunk_size=2000):
+    """
+    Run test_algebra for several cases with a pool of processes. Cases with more than chunk_size d-torsion classes are split into chunks of d-torsion classes which are tested by different processes.
+
+    :param test_cases: List of tuples (d, l, p)
+    :param processes: Number of worker processes
+    :param chunk_size: Number of d-torsion classes tested by one process
+    :return: A generator of tuples (passed, log), in the order of test_cases
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = []
+        for case in test_cases:
+            calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator()
+            calc.d, calc.l, calc.p = case
+            calc._build_graph()
+            count = calc.count_torsion_classes()
+            if count <= chunk_size:
+                futures.append((executor.submit(_run_test_case, case), None))
+            else:
+                chunks = [executor.submit(_run_test_case_chunk, case, first, min(first + chunk_size, count))
+                          for first in range(0, count, chunk_size)]
+                futures.append((executor.submit(_run_test_case_header, case), chunks))
+
+        for future, chunks in futures:
+            passed, log = future.result()
+            if chunks is None or not passed:
+                yield passed, log
+                continue
+            # Merge the failures of the chunks in order
+            failed_tests = []
+            failed_paths = []
+            for chunk in chunks:
+                chunk_failed_tests, chunk_failed_paths = chunk.result()
+                failed_tests.extend(chunk_failed_tests)
+                failed_paths.extend(chunk_failed_paths)
+            string_buffer = StringIO()
+            passed = report_failures(failed_tests, failed_paths, lambda message: print(message, file=string_buffer))
+            yield passed, log + string_buffer.getvalue()
+
+def test_formula(d, l, p, write_output):
+    """
+    Given an algebra with parameters (d,l,p), test whether the number of d-torsion classes agrees with the formula of Remark 4.23 from https://arxiv.org/pdf/2410.19505. The number is computed from G(C) without enumerating the d-torsion classes, so this test also works for sizes which cannot be enumerated.
+    """
+    calc = HigherTauTiltingTheoryHomogeneousLinearNakayamaCalculator()
+    calc.d = d
+    calc.l = l
+    calc.p = p
+    calc._calculate_n()
+    calc._build_graph()
+
+    formula_valid, formula_message = validate_torsion_class_count(d, l, p, calc.n, calc.count_torsion_classes())
+    if not formula_valid:
+        write_output(f"Formula validation failed for d={d}, l={l}, p={p}: {formula_message}")
+    return formula_valid
+
+def test_sampled(d, l, p, samples, write_output):
+    """
+    Given an algebra with parameters (d,l,p), test the summand maximal tau_d-rigid pairs (M^U, P^U) of d-torsion classes U drawn uniformly at random, for sizes where the d-torsion classes cannot all be enumerated. The same three conditions as in test_algebra are checked, using the solver for the minimality.
+    """
+    calc = setup_calculator(d, l, p)
+    rng = random.Random(f"{d},{l},{p}")
+    passed = True
+    for tc, path in calc.sample_torsion_classes(samples, rng):
+        M_U, P_U = calc.compute_tau_d_rigid_pair(tc)
+        size_valid, size_message = validate_tau_d_pair_size(M_U, P_U, calc.n)
+        min_tc_valid, min_tc_message = validate_minimal_torsion_class_solver(calc, M_U, tc)
+        rigid_valid, rigid_message = is_tau_d_rigid_pair(M_U, P_U, calc.l, calc.d)
+        if not size_valid or not min_tc_valid or not rigid_valid:
+            write_output(f"Sampled test failed for d={d}, l={l}, p={p} and the torsion class with path {format_path(path)}")
+            passed = False
+    return passed
+
+@contextmanager
+def temporary_cache_directory():
+    """Point the environment variable D_TORSION_CACHE_DIR, and so the calculators created by the CLI and the server, at a temporary directory which is removed afterwards"""
+    previous = os.environ.get("D_TORSION_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["D_TORSION_CACHE_DIR"] = directory
+        try:
+            yield directory
+        finally:
+            if previous is None:
+                del os.environ["D_TORSION_CACHE_DIR"]
+            else:
+                os.environ["D_TORSION_CACHE_DIR"] = previous
+
+def test_cli(d, l, p, write_output):
+    """
+    Given an algebra with parameters (d,l,p), test the commands of the batch CLI against the calculator: the count and the enumeration, the pairs of all d-torsion classes with a cache directory, and the pairs, minimal torsion classes and rigidity checks of all d-torsion classes given as one batch of queries.
+    """
+    calc = setup_calculator(d, l, p)
+    torsion_classes = calc.get_all_torsion_classes()
+    pairs = calc.compute_tau_d_rigid_pairs([tc for tc, path in torsion_classes])
+
+    def run(argv):
+        output = StringIO()
+        with redirect_stdout(output):
+            exit_code = cli.main(argv + ["-d", str(d), "-l", str(l), "-p", str(p)])
+        return exit_code, output.getvalue().splitlines()
+
+    def to_comma_format(modules):
+        return ",".join(f"M-{module.a}-{module.b}" for module in modules) or "0"
+
+    passed = True
+    with temporary_cache_directory(), tempfile.TemporaryDirectory() as directory:
+        classes_file = os.path.join(directory, "classes.txt")
+        pairs_file = os.path.join(directory, "pairs.txt")
+        with open(classes_file, "w", encoding="utf-8") as f:
+            f.write("# one d-torsion class per line\n")
+            for tc, path in torsion_classes:
+                f.write(to_comma_format(tc) + "\n")
+            f.write("M-0-0\n")
+        with open(pairs_file, "w", encoding="utf-8") as f:
+            for M_U, P_U in pairs:
+                f.write(f"M: {to_comma_format(M_U)}; P: {to_comma_format(P_U)}\n")
+
+        exit_code, lines = run(["count"])
+        if exit_code != 0 or lines != [str(len(torsion_classes))]:
+            write_output(f"CLI count failed for d={d}, l={l}, p={p}")
+            passed = False
+
+        exit_code, lines = run(["enumerate"])
+        expected = [f"{i}\t{string_from_modules(tc)}\t{format_path(path)}" for i, (tc, path) in enumerate(torsion_classes, 1)]
+        if exit_code != 0 or lines != expected:
+            write_output(f"CLI enumerate failed for d={d}, l={l}, p={p}")
+            passed = False
+
+        cache_directory = os.path.join(directory, "cache")
+        exit_code, lines = run(["pairs", "--cache-dir", cache_directory])
+        expected = [f"{i}\t{string_from_modules(tc)}\t{cli.format_pair(calc, M_U, P_U)}"
+                    for i, ((tc, path), (M_U, P_U)) in enumerate(zip(torsion_classes, pairs), 1)]
+        if exit_code != 0 or lines != expected or not os.listdir(cache_directory):
+            write_output(f"CLI pairs with a cache directory failed for d={d}, l={l}, p={p}")
+            passed = False
+
+        # The invalid module on the last line gives an error line and exit code 1, after all other queries are answered
+        exit_code, lines = run(["pairs", "-i", classes_file])
+        expected = [f"{i}\t{cli.format_pair(calc, M_U, P_U)}" for i, (M_U, P_U) in enumerate(pairs, 2)]
+        if exit_code != 1 or lines[:-1] != expected or not lines[-1].startswith(f"{len(pairs) + 2}\terror: "):
+            write_output(f"CLI pairs failed for d={d}, l={l}, p={p}")
+            passed = False
+
+        exit_code, lines = run(["minimal", "-i", pairs_file])
+        expected = [f"{i}\t{string_from_modules(tc)}\t{format_path(path)}" for i, (tc, path) in enumerate(torsion_classes, 1)]
+        if exit_code != 0 or lines != expected:
+            write_output(f"CLI minimal failed for d={d}, l={l}, p={p}")
+            passed = False
+
+        exit_code, lines = run(["check-rigid", "-i", pairs_file])
+        if exit_code != 0 or lines != [f"{i}\ttau_{d}-rigid\tsummand maximal" for i in range(1, len(pairs) + 1)]:
+            write_output(f"CLI check-rigid failed for d={d}, l={l}, p={p}")
+            passed = False
+    return passed
+
+def test_server(cases, write_output):
+    """
+    Test the query server against the calculator for several algebras, served by a server process and one worker process which keep only one calculator each, so that the calculators are replaced between the algebras: the count, all pages of the enumeration, and the pairs, minimal torsion classes and rigidity checks of all d-torsion classes.
+    """
+    def names(modules):
+        return sorted(f"M({module.a},{module.b})" for module in modules)
+
+    def to_comma_format(modules):
+        return ",".join(f"M-{module.a}-{module.b}" for module in modules)
+
+    passed = True
+    with temporary_cache_directory(), tempfile.TemporaryDirectory() as directory:
+        query_server = server.QueryServer(processes=1, max_calculators=1)
+        loop = asyncio.new_event_loop()
+        socket_path = os.path.join(directory, "server.sock")
+        loop.run_until_complete(query_server.start(socket_path))
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            # A second server must neither replace the socket of the running one nor a file which is not a socket, but a stale socket is replaced
+            other_file = os.path.join(directory, "file.sock")
+            with open(other_file, "w") as f:
+                f.write("not a socket")
+            stale_socket = os.path.join(directory, "stale.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(stale_socket)
+            for path in (socket_path, other_file):
+                other_server = server.QueryServer(processes=1)
+                try:
+                    asyncio.run(other_server.start(path))
+                    write_output(f"Server started on {os.path.basename(path)}, which is in use")
+                    passed = False
+                except ValueError:
+                    pass
+                finally:
+                    other_server.close()
+            server.remove_stale_socket(stale_socket)
+            if not os.path.exists(socket_path) or not os.path.exists(other_file) or os.path.exists(stale_socket):
+                write_output("Server removed a socket in use or a file, or kept a stale socket")
+                passed = False
+
+            def request(method, **params):
+                return server.request(method, params, socket_path=socket_path, timeout=60)
+
+            for d, l, p in cases * 2:
+                calc = setup_calculator(d, l, p)
+                torsion_classes = calc.get_all_torsion_classes()
+                pairs = calc.compute_tau_d_rigid_pairs([tc for tc, path in torsion_classes])
+
+                if request("count", d=d, l=l, p=p) != {"count": len(torsion_classes)}:
+                    write_output(f"Server count failed for d={d}, l={l}, p={p}")
+                    passed = False
+
+                page = []
+                offset = 0
+                while offset is not None:
+                    result = request("enumerate", d=d, l=l, p=p, offset=offset, limit=20)
+                    page += result["torsion_classes"]
+                    offset = result["next_offset"]
+                expected = [(i, [calc.G.edge_names[edge] for edge in calc.path_to_edge_ids(path)], calc.path_to_edge_ids(path), names(tc))
+                            for i, (tc, path) in enumerate(torsion_classes)]
+                if [(record["id"], record["path"], record["edge_ids"], sorted(record["modules"])) for record in page] != expected:
+                    write_output(f"Server enumerate failed for d={d}, l={l}, p={p}")
+                    passed = False
+
+                for (tc, path), (M_U, P_U) in zip(torsion_classes, pairs):
+                    pair = request("pairs", d=d, l=l, p=p, modules=to_comma_format(tc) or "0")
+                    minimal = request("minimal", d=d, l=l, p=p, M=to_comma_format(M_U), P=to_comma_format(P_U))
+                    rigid = request("check_rigid", d=d, l=l, p=p, M=to_comma_format(M_U), P=to_comma_format(P_U))
+                    if ((sorted(pair["M_U"]), sorted(pair["P_U"])) != (names(M_U), names(P_U))
+                            or minimal["torsion_class"] is None or sorted(minimal["torsion_class"]["modules"]) != names(tc)
+                            or minimal["torsion_class"]["edge_ids"] != calc.path_to_edge_ids(path)
+                            or not rigid["summand_maximal"]):
+                        write_output(f"Server queries failed for d={d}, l={l}, p={p} and the torsion class with path {format_path(path)}")
+                        passed = False
+                        break
+
+                # The queries which do not enumerate are answered with the calculator kept by the server process
+                if list(query_server.calculators.calculators) != [(d, l, p)]:
+                    write_output(f"Server process does not keep the calculator of d={d}, l={l}, p={p}")
+                    passed = False
+
+                try:
+                    request("pairs", d=d, l=l, p=p, modules="M-0-0")
+                    write_output(f"Server accepted an invalid query for d={d}, l={l}, p={p}")
+                    passed = False
+                except ValueError:
+                    pass
+        finally:
+            asyncio.run_coroutine_threadsafe(query_server.stop(), loop).result(60)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            query_server.close()
+            loop.close()
+    return passed
+
+def run_tests(processes=None):
+    """
+    Run tests for several parameter combinations and save output to log file.
+
+    :param processes: Number of worker processes, by default the number of CPUs. With one process the tests are run one after another in this process.
+    """
+    processes = processes or os.cpu_count() or 1
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     log_file = f"test_results_{timestamp}.txt"
     string_buffer = StringIO()
@@ -210,6 +1033,20 @@ def run_tests():
         (6, 6, 6),
     ]
     
+    # Cases which are only counted, to check the formulas beyond enumerable sizes
+    formula_cases = [(d, l, p) for d in range(2, 21) for l in range(2, 21) for p in (2, 4)
+                     if l == 2 or d % 2 == 0]
+
+    # Cases on which the batch CLI is checked against the calculator
+    cli_cases = [(2, 2, 4), (4, 3, 4)]
+
+    # Cases on which the query server is checked against the calculator
+    server_cases = [(2, 2, 4), (4, 3, 4)]
+
+    # Cases which are only sampled, to check the tau_d-rigid pairs beyond enumerable sizes
+    sampled_cases = [(2, 2, 60), (3, 2, 41), (4, 4, 30), (6, 6, 20), (2, 5, 40)]
+    samples = 20
+
     total_cases = len(test_cases)
     all_passed = True
     
@@ -219,11 +1056,46 @@ def run_tests():
     
     write_output("Starting tests...")
     
-    for case_num, (d, l, p) in enumerate(test_cases, 1):
-        write_output(f"\nRunning test case {case_num}/{total_cases}")
-        if not test_algebra(d, l, p, write_output):
-            all_passed = False
+    if processes == 1:
+        for case_num, (d, l, p) in enumerate(test_cases, 1):
+            write_output(f"\nRunning test case {case_num}/{total_cases}")
+            if not test_algebra(d, l, p, write_output):
+                all_passed = False
+    else:
+        for case_num, (passed, log) in enumerate(run_test_cases_parallel(test_cases, processes), 1):
+            write_output(f"\nRunning test case {case_num}/{total_cases}")
+            print(log, end='')
+            print(log, end='', file=string_buffer)
+            if not passed:
+                all_passed = False
+
+    write_output(f"\nChecking formulas for {len(formula_cases)} further cases")
+    formulas_passed = all([test_formula(d, l, p, write_output) for d, l, p in formula_cases])
+    if formulas_passed:
+        write_output("All formulas agree with the number of torsion classes!")
+    else:
+        all_passed = False
+
+    write_output(f"\nChecking {samples} random d-torsion classes for each of {len(sampled_cases)} further cases")
+    sampled_passed = all([test_sampled(d, l, p, samples, write_output) for d, l, p in sampled_cases])
+    if sampled_passed:
+        write_output("All sampled tau_d-rigid pairs satisfy all three conditions!")
+    else:
+        all_passed = False
     
+    write_output(f"\nChecking the batch CLI for {len(cli_cases)} cases")
+    cli_passed = all([test_cli(d, l, p, write_output) for d, l, p in cli_cases])
+    if cli_passed:
+        write_output("The batch CLI agrees with the calculator!")
+    else:
+        all_passed = False
+
+    write_output(f"\nChecking the query server for {len(server_cases)} cases")
+    if test_server(server_cases, write_output):
+        write_output("The query server agrees with the calculator!")
+    else:
+        all_passed = False
+
     if all_passed:
         write_output("\nAll tests passed successfully!")
     else:
@@ -237,4 +1109,6 @@ def run_tests():
     print(f"\nTest results have been saved to: {log_file}")
 
 if __name__ == "__main__":
-    run_tests()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the tests and save the output to a log file")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    run_tests(parser.parse_args().processes)
\ No newline at end of file